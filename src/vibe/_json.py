@@ -0,0 +1,29 @@
+"""JSON encoding and decoding, using orjson when it is installed.
+
+orjson is an optional speedup (``pip install vibe[speedups]``); without it the
+stdlib json module is used. Both raise ``json.JSONDecodeError`` (orjson's
+error subclasses it) on invalid input.
+"""
+
+import json
+from typing import Any
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse a JSON document from bytes or text."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_pretty(obj: Any) -> str:
+    """Serialize obj as JSON indented by two spaces."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
@@ -1,7 +1,18 @@
 """Check execution and retry logic."""
 
+import io
+import os
+import random
+import re
+import shlex
+import shutil
 import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import IO
 
 from vibe.cli.utils import error, info, warning
 from vibe.project_config import ChecksConfig, CheckStep
@@ -15,6 +26,19 @@ from vibe.providers.claude import (
 )
 
 
+# Only the tail of a check's output is kept, even while it is being read; the
+# fix prompt never needs megabytes of log, and neither does memory.
+MAX_OUTPUT_BYTES = 64 * 1024
+
+# Size of each read from a check's output pipes
+_READ_CHUNK_BYTES = 8 * 1024
+
+
+# Anything that needs /bin/sh to interpret: pipes, redirects, expansion,
+# globbing, comments, escapes and command lists
+_SHELL_SYNTAX = re.compile(r"[|&;<>$`()*?\[\]{}~#!\\\n]")
+
+
 @dataclass
 class CheckResult:
     """Result of a check execution."""
@@ -23,6 +47,56 @@ class CheckResult:
     step_name: str
     output: str
     error: str | None = None
+    command: str = ""
+
+
+class _OutputTail:
+    """The last MAX_OUTPUT_BYTES read from a pipe, however much it produces.
+
+    Output is read in chunks, and the oldest chunks are dropped as soon as the
+    newer ones cover the limit, so at most one extra chunk is held.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: deque[bytes] = deque()
+        self._kept = 0
+        self.total = 0
+
+    def read_from(self, pipe: IO[bytes]) -> None:
+        """Read the pipe to EOF, keeping only its tail."""
+        while chunk := pipe.read(_READ_CHUNK_BYTES):
+            self._chunks.append(chunk)
+            self._kept += len(chunk)
+            self.total += len(chunk)
+            while self._kept - len(self._chunks[0]) >= MAX_OUTPUT_BYTES:
+                self._kept -= len(self._chunks.popleft())
+
+    def decode(self) -> str:
+        """Decode the kept tail, noting how much earlier output was dropped."""
+        data = b"".join(self._chunks)[-MAX_OUTPUT_BYTES:]
+        text = data.decode("utf-8", errors="replace")
+        dropped = self.total - len(data)
+        if not dropped:
+            return text
+        return f"... ({dropped} bytes of earlier output truncated)\n{text}"
+
+
+def _split_command(command: str) -> list[str] | None:
+    """Return an argv for commands that can run without a shell, else None.
+
+    Commands using shell syntax, starting with a variable assignment, or whose
+    program isn't an executable on PATH (shell builtins such as ``cd``) still
+    go through the shell.
+    """
+    if _SHELL_SYNTAX.search(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or "=" in argv[0] or shutil.which(argv[0]) is None:
+        return None
+    return argv
 
 
 def run_check(step: CheckStep) -> CheckResult:
@@ -36,29 +110,38 @@ def run_check(step: CheckStep) -> CheckResult:
     """
     info(f"Running check '{step.name}': {step.command}")
 
+    # Simple commands are exec'd directly, saving a /bin/sh process per check
+    argv = _split_command(step.command)
     try:
-        result = subprocess.run(
-            step.command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-
-        success = result.returncode == 0
-        output = result.stdout
-        error_output = result.stderr if not success else None
+        stdout, stderr = _OutputTail(), _OutputTail()
+        with subprocess.Popen(
+            argv or step.command,
+            shell=argv is None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        ) as proc:
+            # Drain both pipes at once, so neither can fill up and stall the check
+            reader = threading.Thread(target=stderr.read_from, args=(proc.stderr,))
+            reader.start()
+            stdout.read_from(proc.stdout)
+            reader.join()
+            returncode = proc.wait()
+
+        success = returncode == 0
+        output = stdout.decode()
+        error_output = stderr.decode() if not success else None
 
         if success:
             info(f"Check '{step.name}' passed")
         else:
-            error(f"Check '{step.name}' failed with exit code {result.returncode}")
+            error(f"Check '{step.name}' failed with exit code {returncode}")
 
         return CheckResult(
             success=success,
             step_name=step.name,
             output=output,
             error=error_output,
+            command=step.command,
         )
     except Exception as e:
         error(f"Error executing check '{step.name}': {e}")
@@ -67,14 +150,111 @@ def run_check(step: CheckStep) -> CheckResult:
             step_name=step.name,
             output="",
             error=str(e),
+            command=step.command,
         )
 
 
+def _run_all(steps: list[CheckStep], max_concurrency: int | None) -> list[CheckResult]:
+    """Run check steps concurrently.
+
+    Args:
+        steps: The check steps to execute.
+        max_concurrency: Maximum number of steps running at once. Defaults to
+            the CPU count when None.
+
+    Returns:
+        List of check results in the same order as steps.
+    """
+    workers = min(len(steps), max_concurrency or os.cpu_count() or 1)
+    if workers <= 1:
+        return [run_check(step) for step in steps]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_check, steps))
+
+
+def _build_fix_prompt(failed_checks: list[CheckResult]) -> str:
+    """Build the prompt asking Claude to fix the failed checks."""
+    buf = io.StringIO()
+    buf.write("The following checks failed:\n")
+    for failed in failed_checks:
+        buf.write(f"- `{failed.command}`\n")
+    buf.write("\nError outputs:\n")
+    for failed in failed_checks:
+        error_output = failed.error or failed.output or "No output"
+        buf.write(f"{failed.step_name}:\n{error_output}\n")
+    buf.write("\nPlease run these commands and fix all found issues.")
+    return buf.getvalue()
+
+
+def _backoff_delay(config: ChecksConfig, attempt: int) -> float:
+    """Compute the exponential backoff delay with jitter for a retry attempt."""
+    delay = config.base_delay * (2**attempt) * (1 + random.random() * config.jitter)
+    return min(delay, config.max_delay)
+
+
+def _invoke_fix(config: ChecksConfig, fix_prompt: str, retry_count: int) -> int | None:
+    """Call Claude with the fix prompt, backing off on transient failures.
+
+    Only the Claude call is retried, since the checks cannot change until a
+    fix has run. Each attempt uses up one of the configured retries.
+
+    Args:
+        config: The checks configuration.
+        fix_prompt: The prompt asking Claude to fix the failed checks.
+        retry_count: The number of retries used up before this fix.
+
+    Returns:
+        The number of retries used up once the fix has run, or None if it
+        could not be run.
+    """
+    while True:
+        try:
+            invoke_claude(fix_prompt)
+        except ClaudeCommandNotFoundError as e:
+            error(f"Error: {e}")
+            warning("Cannot retry checks - Claude command not found")
+            return None
+        except ClaudeCommandError as e:
+            error(f"Error: {e}")
+            if e.stderr:
+                error(f"Error output: {e.stderr}")
+            if not e.is_transient:
+                warning("Claude fix execution failed, continuing with current results")
+                return None
+            warning("Claude fix execution hit a transient error")
+            # No Claude call is left to back off for
+            if retry_count + 1 >= config.max_retries:
+                warning(
+                    f"Reached maximum retries ({config.max_retries}). "
+                    f"Some checks still failing."
+                )
+                return None
+            delay = _backoff_delay(config, retry_count)
+            info(f"Backing off {delay:.1f}s before retry")
+            time.sleep(delay)
+            retry_count += 1
+            info(f"Retry attempt {retry_count}/{config.max_retries}")
+        except ClaudeJSONParseError as e:
+            error(f"Error: {e}")
+            error(f"Raw output: {e.raw_output}")
+            warning(
+                "Claude fix execution had parsing issues, continuing with current results"
+            )
+            return None
+        else:
+            info("Claude fix execution completed, re-running checks...")
+            return retry_count + 1
+
+
 def run_checks_with_retry(config: ChecksConfig) -> list[CheckResult]:
     """Run checks with automatic retry logic.
 
     If any check fails, automatically calls Claude with a fix prompt and retries
     all checks. Continues until all checks pass or max_retries is reached.
+    Transient Claude failures (rate limits, overload) retry the fix call after
+    an exponential backoff delay, without re-running the checks; other Claude
+    failures stop the retry loop.
 
     Args:
         config: The checks configuration.
@@ -92,16 +272,9 @@ def run_checks_with_retry(config: ChecksConfig) -> list[CheckResult]:
         if retry_count > 0:
             info(f"Retry attempt {retry_count}/{config.max_retries}")
 
-        # Run all checks sequentially
-        results = []
-        failed_checks = []
-
-        for step in config.steps:
-            result = run_check(step)
-            results.append(result)
-
-            if not result.success:
-                failed_checks.append(result)
+        # Checks are independent, so run them in parallel
+        results = _run_all(config.steps, config.max_concurrency)
+        failed_checks = [r for r in results if not r.success]
 
         # If all checks passed, return results
         if not failed_checks:
@@ -116,49 +289,16 @@ def run_checks_with_retry(config: ChecksConfig) -> list[CheckResult]:
             )
             return results
 
-        # Build fix prompt from failed checks
-        failed_commands = []
-        error_outputs = []
-
-        for failed in failed_checks:
-            step = next(s for s in config.steps if s.name == failed.step_name)
-            failed_commands.append(f"`{step.command}`")
-            error_output = failed.error or failed.output or "No output"
-            error_outputs.append(f"{step.name}:\n{error_output}")
-
-        fix_prompt = (
-            f"The following checks failed:\n"
-            f"{chr(10).join(f'- {cmd}' for cmd in failed_commands)}\n\n"
-            f"Error outputs:\n{chr(10).join(error_outputs)}\n\n"
-            f"Please run these commands and fix all found issues."
-        )
+        fix_prompt = _build_fix_prompt(failed_checks)
 
         info("Calling Claude to fix failing checks...")
         info(f"Fix prompt:\n-------\n{fix_prompt}\n-------")
 
         # Call Claude with fix prompt
-        try:
-            invoke_claude(fix_prompt)
-            info("Claude fix execution completed, re-running checks...")
-        except ClaudeCommandNotFoundError as e:
-            error(f"Error: {e}")
-            warning("Cannot retry checks - Claude command not found")
-            return results
-        except ClaudeCommandError as e:
-            error(f"Error: {e}")
-            if e.stderr:
-                error(f"Error output: {e.stderr}")
-            warning("Claude fix execution failed, continuing with current results")
+        next_count = _invoke_fix(config, fix_prompt, retry_count)
+        if next_count is None:
             return results
-        except ClaudeJSONParseError as e:
-            error(f"Error: {e}")
-            error(f"Raw output: {e.raw_output}")
-            warning(
-                "Claude fix execution had parsing issues, continuing with current results"
-            )
-            return results
-
-        retry_count += 1
+        retry_count = next_count
 
     # Should not reach here, but return results if we do
     return results
@@ -1,10 +1,16 @@
 """CLI utility functions."""
 
+from __future__ import annotations
+
+import os
 import sys
+from functools import cache
 from pathlib import Path
-from typing import NoReturn
+from typing import TYPE_CHECKING, NoReturn
+
 
-from rich.console import Console
+if TYPE_CHECKING:
+    from rich.console import Console
 
 
 class NotInGitRepositoryError(FileNotFoundError):
@@ -14,34 +20,97 @@ class NotInGitRepositoryError(FileNotFoundError):
         super().__init__("Not in a git repository")
 
 
-# Global console instance
-console = Console()
-error_console = Console(stderr=True)
+# Rich markup and styling only pay off on an interactive terminal; when output
+# is piped (CI logs, files) messages are written as plain text and rich is
+# never imported.
+_USE_RICH = sys.stdout.isatty()
+
+
+# Numeric severities for the LOG_LEVEL setting, as in the logging module
+_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+
+@cache
+def _log_threshold() -> int:
+    """Return the minimum severity to print, from the LOG_LEVEL setting.
+
+    A message must never fail because of the settings, so invalid settings fall
+    back to the raw LOG_LEVEL variable, and an unknown level to INFO.
+    """
+    # Deferred: settings pull in pydantic-settings and read .env
+    from pydantic import ValidationError  # noqa: PLC0415
+
+    from vibe.settings import get_settings  # noqa: PLC0415
+
+    try:
+        level = get_settings().log_level
+    except ValidationError:
+        level = os.environ.get("LOG_LEVEL", "INFO")
+    return _LEVELS.get(level.upper(), _LEVELS["INFO"])
+
+
+def reset_log_level() -> None:
+    """Forget the cached log level, so the next message reads LOG_LEVEL again."""
+    _log_threshold.cache_clear()
+
+
+def enabled(level: str) -> bool:
+    """Whether messages of the given level ("DEBUG", "INFO", ...) are printed.
+
+    Lets callers skip building expensive messages that would be dropped.
+    """
+    return _LEVELS[level] >= _log_threshold()
+
+
+@cache
+def _get_console(stderr: bool = False) -> Console:
+    """Return a cached rich console for stdout or stderr."""
+    from rich.console import Console  # noqa: PLC0415
+
+    return Console(stderr=stderr)
+
+
+def _emit(
+    label: str, style: str, message: str, level: int, stderr: bool = False
+) -> None:
+    """Print a labelled message, styled with rich when attached to a TTY.
+
+    Messages below the configured log level are dropped before any formatting.
+    Critical messages skip the lookup, so fatal() never depends on settings.
+    """
+    if level < _LEVELS["CRITICAL"] and level < _log_threshold():
+        return
+    if _USE_RICH:
+        _get_console(stderr).print(f"[{style}]{label}:[/{style}] {message}")
+    else:
+        stream = sys.stderr if stderr else sys.stdout
+        stream.write(f"{label}: {message}\n")
 
 
 def success(message: str) -> None:
     """Print a success message."""
-    console.print(f"[green]SUCCESS:[/green] {message}")
+    _emit("SUCCESS", "green", message, _LEVELS["INFO"])
 
 
 def info(message: str) -> None:
     """Print an info message."""
-    console.print(f"[blue]INFO:[/blue] {message}")
+    _emit("INFO", "blue", message, _LEVELS["INFO"])
 
 
 def warning(message: str) -> None:
     """Print a warning message."""
-    console.print(f"[yellow]WARNING:[/yellow] {message}")
+    _emit("WARNING", "yellow", message, _LEVELS["WARNING"])
 
 
 def error(message: str) -> None:
     """Print an error message."""
-    error_console.print(f"[red]ERROR:[/red] {message}")
+    _emit("ERROR", "red", message, _LEVELS["ERROR"], stderr=True)
 
 
 def fatal(message: str, exit_code: int = 1) -> NoReturn:
     """Print an error and exit."""
-    error(message)
+    # Always shown, whatever the log level
+    _emit("ERROR", "red", message, _LEVELS["CRITICAL"], stderr=True)
     sys.exit(exit_code)
 
 
@@ -57,7 +126,13 @@ def find_project_root(start: Path | None = None) -> Path:
     Raises:
         NotInGitRepositoryError: If not in a git repository.
     """
-    current = start or Path.cwd()
+    return _find_project_root(start or Path.cwd())
+
+
+@cache
+def _find_project_root(start: Path) -> Path:
+    """Walk up from start to the directory containing .git (cached per start)."""
+    current = start
 
     while current != current.parent:
         if (current / ".git").exists():
@@ -1,86 +1,49 @@
 """CLI command to invoke Claude Code headless with a prompt file."""
 
-import json
+from __future__ import annotations
+
+import contextlib
+import mmap
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
-import yaml
 
-from vibe.checks import run_checks_with_retry
-from vibe.cli.utils import error, fatal, info, warning
-from vibe.project_config import ProjectConfig, load_project_config
+from vibe import _json
+from vibe.cli.utils import enabled, error, fatal, info, warning
 from vibe.providers.claude import (
     ClaudeCommandError,
     ClaudeCommandNotFoundError,
+    ClaudeError,
     ClaudeJSONParseError,
+    InvokeSession,
 )
 from vibe.providers.claude import (
     invoke as invoke_claude,
 )
+from vibe.state import StateStore
 
 
-def _get_state_file_path() -> Path:
-    """Get the path to the state file."""
-    return Path.cwd() / ".vibe" / "state.json"
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
+    from click.shell_completion import CompletionItem
 
-def _load_state() -> dict[str, list[str]]:
-    """Load state from .vibe/state.json.
-
-    Returns:
-        Dictionary mapping directory paths (as strings) to lists of completed filenames.
-        Returns empty dict if state file doesn't exist or is invalid.
-    """
-    state_path = _get_state_file_path()
-    if not state_path.exists():
-        return {}
-
-    try:
-        with state_path.open(encoding="utf-8") as f:
-            state = json.load(f)
-            # Validate structure
-            if isinstance(state, dict):
-                return state
-            return {}
-    except (json.JSONDecodeError, Exception) as e:
-        warning(f"Failed to load state file: {e}. Starting fresh.")
-        return {}
-
-
-def _save_state(state: dict[str, list[str]]) -> None:
-    """Save state to .vibe/state.json.
-
-    Args:
-        state: Dictionary mapping directory paths to lists of completed filenames.
-    """
-    state_path = _get_state_file_path()
-    state_path.parent.mkdir(parents=True, exist_ok=True)
-
-    try:
-        with state_path.open("w", encoding="utf-8") as f:
-            json.dump(state, f, indent=2)
-    except Exception as e:
-        error(f"Failed to save state file: {e}")
-
-
-def _mark_complete(directory_path: Path, filename: str) -> None:
-    """Mark a prompt file as complete in the state.
-
-    Args:
-        directory_path: The directory containing the prompt file.
-        filename: The name of the completed prompt file.
-    """
-    state = _load_state()
-    dir_key = str(directory_path.resolve())
-    if dir_key not in state:
-        state[dir_key] = []
-    if filename not in state[dir_key]:
-        state[dir_key].append(filename)
-    _save_state(state)
+    from vibe.project_config import ProjectConfig
 
 
 def _load_config() -> ProjectConfig | None:
     """Load project configuration and handle errors."""
+    # Deferred: YAML and the pydantic models are only needed once a config is
+    # actually loaded, not for --help
+    import yaml  # noqa: PLC0415
+
+    from vibe.project_config import load_project_config  # noqa: PLC0415
+
     try:
         project_config = load_project_config()
     except yaml.YAMLError as e:
@@ -99,10 +62,51 @@ def _load_config() -> ProjectConfig | None:
         return project_config
 
 
-def _read_prompt(prompt_file: Path) -> str:
-    """Read and validate prompt from file."""
+# Extensions of the prompt files picked up from a directory, as a tuple for
+# str.endswith
+PROMPT_SUFFIXES = (".txt", ".md")
+
+# PATH argument meaning "read the prompt from stdin"
+STDIN_PATH = Path("-")
+
+# ASCII whitespace, as stripped by bytes.strip()
+_WHITESPACE = b" \t\n\r\x0b\x0c"
+
+
+def _read_stripped(prompt_file: Path) -> str:
+    """Read a UTF-8 file with surrounding whitespace removed.
+
+    The file is memory-mapped and only the stripped span is copied out and
+    decoded, so large prompts are not copied whole before stripping.
+    """
+    with prompt_file.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start, end = 0, size
+            while start < end and data[start] in _WHITESPACE:
+                start += 1
+            while end > start and data[end - 1] in _WHITESPACE:
+                end -= 1
+            return data[start:end].decode("utf-8")
+
+
+def _read_prompt(prompt_file: Path, prefetched: Future[str] | None = None) -> str:
+    """Read and validate prompt from file.
+
+    Args:
+        prompt_file: Path to the prompt file, or STDIN_PATH to read stdin.
+        prefetched: A pending background read of the file; read errors are
+            reported when it is consumed, just like a direct read.
+    """
     try:
-        content = prompt_file.read_text(encoding="utf-8").strip()
+        if prefetched is not None:
+            content = prefetched.result()
+        elif prompt_file == STDIN_PATH:
+            content = sys.stdin.read().strip()
+        else:
+            content = _read_stripped(prompt_file)
     except FileNotFoundError:
         fatal(f"Prompt file not found: {prompt_file}")
     except Exception as e:
@@ -114,7 +118,10 @@ def _read_prompt(prompt_file: Path) -> str:
 
 
 def _invoke_claude_with_reporting(
-    prompt_content: str, raise_on_error: bool = False
+    prompt_content: str,
+    raise_on_error: bool = False,
+    verbose: bool = False,
+    session: InvokeSession | None = None,
 ) -> dict:
     """Invoke Claude and handle reporting/errors.
 
@@ -122,6 +129,10 @@ def _invoke_claude_with_reporting(
         prompt_content: The prompt to send to Claude.
         raise_on_error: If True, raise exceptions instead of calling fatal().
             Used for directory processing where errors should be caught.
+        verbose: If True, also print the full JSON output from Claude. It is
+            always printed when the log level is DEBUG.
+        session: If given, send the prompt to this long-lived Claude session
+            instead of starting a new claude process.
 
     Returns:
         Dictionary containing Claude output.
@@ -134,7 +145,10 @@ def _invoke_claude_with_reporting(
     info(f"Running Claude with prompt:\n-------\n{prompt_content}\n-------")
 
     try:
-        output_data = invoke_claude(prompt_content)
+        if session is not None:
+            output_data = session.invoke(prompt_content)
+        else:
+            output_data = invoke_claude(prompt_content)
     except ClaudeCommandNotFoundError as e:
         if raise_on_error:
             raise
@@ -151,10 +165,12 @@ def _invoke_claude_with_reporting(
             raise
         fatal(str(e))
     else:
-        # Display parsed output
-        info("---- unparsed Claude output ----")
-        info(json.dumps(output_data, indent=2))
-        info("--------------------------------")
+        # Dumping the full output is costly for long transcripts; only on request
+        # (--verbose or LOG_LEVEL=DEBUG), and never just to have it filtered out
+        if (verbose and enabled("INFO")) or enabled("DEBUG"):
+            info("---- unparsed Claude output ----")
+            info(_json.dumps_pretty(output_data))
+            info("--------------------------------")
         info(
             f"Claude output parsed successfully. "
             f"{len(output_data)} keys found in JSON output."
@@ -178,37 +194,46 @@ def _run_project_checks(project_config: ProjectConfig | None) -> bool:
     Returns:
         True if all checks passed, False otherwise.
     """
-    if not (project_config and project_config.checks):
+    if not (project_config and project_config.checks and project_config.checks.steps):
         return True
 
+    # Deferred with the config models; see _load_config
+    from vibe.checks import run_checks_with_retry  # noqa: PLC0415
+
     try:
         info("Running configured checks...")
         check_results = run_checks_with_retry(project_config.checks)
-
-        # Report final check status
-        passed = [r for r in check_results if r.success]
-        failed = [r for r in check_results if not r.success]
-
-        if passed:
-            info(f"Passed checks: {len(passed)}/{len(check_results)}")
-        if failed:
-            warning(f"Failed checks: {len(failed)}/{len(check_results)}")
-            for result in failed:
-                error(f"  - {result.step_name}")
-                if result.error:
-                    error(f"    Error: {result.error}")
-        return len(failed) == 0
     except Exception as e:
         error(f"Error running checks: {e}")
         warning("Continuing despite check errors")
         return False
 
-
-def _process_single_file(prompt_file: Path) -> bool:
+    # Report final check status in a single pass
+    passed_count = 0
+    failed = []
+    for result in check_results:
+        if result.success:
+            passed_count += 1
+        else:
+            failed.append(result)
+
+    if passed_count:
+        info(f"Passed checks: {passed_count}/{len(check_results)}")
+    if failed:
+        warning(f"Failed checks: {len(failed)}/{len(check_results)}")
+        for result in failed:
+            error(f"  - {result.step_name}")
+            if result.error:
+                error(f"    Error: {result.error}")
+    return not failed
+
+
+def _process_single_file(prompt_file: Path, verbose: bool = False) -> bool:
     """Process a single prompt file.
 
     Args:
         prompt_file: Path to the prompt file.
+        verbose: If True, print the full JSON output from Claude.
 
     Returns:
         True if processing was successful (including checks), False otherwise.
@@ -216,111 +241,316 @@ def _process_single_file(prompt_file: Path) -> bool:
     project_config = _load_config()
     info(f"project_config: {project_config}")
     prompt_content = _read_prompt(prompt_file)
-    _invoke_claude_with_reporting(prompt_content)
+    _invoke_claude_with_reporting(prompt_content, verbose=verbose)
     return _run_project_checks(project_config)
 
 
-def _process_directory(directory_path: Path) -> None:
-    """Process all prompt files in a directory sequentially.
+def _stop_processing(message: str, detail: str | None = None) -> None:
+    """Report a failed prompt file and that directory processing stops here."""
+    error(message)
+    if detail:
+        error(detail)
+    warning("Stopping directory processing. Fix issues and restart to continue.")
+
+
+def _run_prompt(
+    prompt_file: Path,
+    verbose: bool = False,
+    prefetched: Future[str] | None = None,
+    session: InvokeSession | None = None,
+) -> None:
+    """Read one prompt file of a directory and send it to Claude."""
+    prompt_content = _read_prompt(prompt_file, prefetched)
+    _invoke_claude_with_reporting(
+        prompt_content,
+        raise_on_error=True,
+        verbose=verbose,
+        session=session,
+    )
+
+
+def _finish_prompt(
+    prompt_file: Path,
+    run: Callable[[], object],
+    project_config: ProjectConfig | None,
+) -> bool:
+    """Wait for a prompt's Claude run, then run the project checks.
 
     Args:
-        directory_path: Path to the directory containing prompt files.
+        prompt_file: The prompt file being processed.
+        run: Runs (or waits for) the Claude invocation, raising on failure.
+        project_config: The project configuration with the checks to run.
+
+    Returns:
+        True if the prompt can be marked complete; failures are reported and
+        return False.
     """
-    # Find all .txt and .md files
-    prompt_files = []
-    for ext in [".txt", ".md"]:
-        prompt_files.extend(directory_path.glob(f"*{ext}"))
+    try:
+        run()
+        checks_passed = _run_project_checks(project_config)
+    except ClaudeError as e:
+        _stop_processing(f"✗ Failed: {prompt_file.name}", f"Error: {e}")
+        return False
+    except Exception as e:
+        _stop_processing(f"✗ Failed: {prompt_file.name}", f"Unexpected error: {e}")
+        return False
 
-    if not prompt_files:
-        warning(f"No .txt or .md files found in directory: {directory_path}")
-        return
+    if not checks_passed:
+        _stop_processing(f"✗ Failed: {prompt_file.name} (checks did not pass)")
+        return False
+    return True
+
+
+def _process_sequentially(
+    prompt_files: list[Path],
+    project_config: ProjectConfig | None,
+    mark_complete: Callable[[str], None],
+    verbose: bool = False,
+    reuse_session: bool = False,
+) -> bool:
+    """Process prompt files one after another, stopping at the first failure.
+
+    Returns:
+        True if every prompt file completed, False otherwise.
+    """
+    # One Claude process for the whole directory when reusing a session
+    session_cm = InvokeSession() if reuse_session else contextlib.nullcontext()
+    # Read the next prompt file in the background while Claude works on this one
+    prefetcher = ThreadPoolExecutor(max_workers=1)
+    with session_cm as session, prefetcher:
+        prefetched = prefetcher.submit(_read_stripped, prompt_files[0])
+        for index, prompt_file in enumerate(prompt_files):
+            info(f"\n{'=' * 60}")
+            info(f"Processing: {prompt_file.name}")
+            info(f"{'=' * 60}")
+
+            current = prefetched
+            if index + 1 < len(prompt_files):
+                prefetched = prefetcher.submit(_read_stripped, prompt_files[index + 1])
+
+            run = partial(_run_prompt, prompt_file, verbose, current, session)
+            if not _finish_prompt(prompt_file, run, project_config):
+                return False
+
+            # Mark as complete only if checks passed
+            mark_complete(prompt_file.name)
+            info(f"✓ Completed: {prompt_file.name}")
+    return True
+
+
+def _process_in_parallel(
+    prompt_files: list[Path],
+    project_config: ProjectConfig | None,
+    mark_complete: Callable[[str], None],
+    workers: int,
+    verbose: bool = False,
+) -> bool:
+    """Invoke Claude for up to `workers` prompt files at once.
+
+    Prompts are read and sent to Claude in worker threads, since each call is
+    a blocking subprocess. Checks, state updates and reporting stay on the
+    calling thread, in completion order, so no locking is needed. On the
+    first failure the prompts not yet started are cancelled; those already
+    running finish but are not marked complete.
 
-    # Sort files ascending by filename
-    prompt_files.sort(key=lambda p: p.name)
+    Returns:
+        True if every prompt file completed, False otherwise.
+    """
+    info(f"Running up to {workers} prompt(s) in parallel")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_run_prompt, prompt_file, verbose): prompt_file
+            for prompt_file in prompt_files
+        }
+        try:
+            for future in as_completed(futures):
+                prompt_file = futures[future]
+                if not _finish_prompt(prompt_file, future.result, project_config):
+                    return False
+
+                mark_complete(prompt_file.name)
+                info(f"✓ Completed: {prompt_file.name}")
+        finally:
+            # Never start queued prompts after a failure or a fatal error
+            executor.shutdown(cancel_futures=True)
+    return True
 
-    info(f"Found {len(prompt_files)} prompt file(s) in directory")
 
-    # Load state for this directory
-    state = _load_state()
+def _process_directory(
+    directory_path: Path,
+    verbose: bool = False,
+    reuse_session: bool = False,
+    parallel: int = 1,
+    order: str = "name",
+) -> None:
+    """Process all prompt files in a directory, sequentially by default.
+
+    Args:
+        directory_path: Path to the directory containing prompt files.
+        verbose: If True, print the full JSON output from Claude.
+        reuse_session: If True, send all prompts to one long-lived Claude
+            process instead of starting one per prompt.
+        parallel: Maximum number of Claude invocations running at once.
+        order: "name" to process files by filename, or "mtime" to process
+            them by modification time (oldest first, ties by filename).
+    """
+    # Load state once for the whole run; lookups and updates stay in memory
+    state = StateStore.for_cwd()
     dir_key = str(directory_path.resolve())
-    completed_files = set(state.get(dir_key, []))
 
-    # Filter out already completed files
-    remaining_files = [f for f in prompt_files if f.name not in completed_files]
+    # Find all .txt and .md files in a single directory scan, setting completed
+    # ones aside as they are seen; only pending entries are kept, with their
+    # sort key. Pending files are stat'ed (once, DirEntry caches it) only when
+    # ordering by mtime.
+    by_mtime = order == "mtime"
+    found_count = 0
+    pending_entries = []
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(PROMPT_SUFFIXES) and entry.is_file():
+                found_count += 1
+                if not state.is_done(dir_key, entry.name):
+                    mtime = entry.stat().st_mtime_ns if by_mtime else 0
+                    pending_entries.append((mtime, entry.name, entry.path))
+
+    if not found_count:
+        warning(f"No .txt or .md files found in directory: {directory_path}")
+        return
+
+    info(f"Found {found_count} prompt file(s) in directory")
 
-    if completed_files:
-        info(f"Skipping {len(completed_files)} already completed file(s)")
-    if not remaining_files:
+    skipped_count = found_count - len(pending_entries)
+    if skipped_count:
+        info(f"Skipping {skipped_count} already completed file(s)")
+    if not pending_entries:
         info("All prompt files in this directory have been completed.")
         return
 
+    # Sort files ascending by mtime when requested, then by filename (names are
+    # unique within the directory); only these become Path objects
+    pending_entries.sort()
+    remaining_files = [Path(path) for _, _, path in pending_entries]
+
     info(f"Processing {len(remaining_files)} remaining file(s)")
 
     project_config = _load_config()
 
-    # Process each file sequentially
-    for prompt_file in remaining_files:
-        info(f"\n{'=' * 60}")
-        info(f"Processing: {prompt_file.name}")
-        info(f"{'=' * 60}")
-
-        try:
-            prompt_content = _read_prompt(prompt_file)
-            _invoke_claude_with_reporting(prompt_content, raise_on_error=True)
-            checks_passed = _run_project_checks(project_config)
-
-            if checks_passed:
-                # Mark as complete only if checks passed
-                _mark_complete(directory_path, prompt_file.name)
-                info(f"✓ Completed: {prompt_file.name}")
-            else:
-                error(f"✗ Failed: {prompt_file.name} (checks did not pass)")
-                warning(
-                    "Stopping directory processing. Fix issues and restart to continue."
-                )
-                return
-        except (
-            ClaudeCommandNotFoundError,
-            ClaudeCommandError,
-            ClaudeJSONParseError,
-        ) as e:
-            error(f"✗ Failed: {prompt_file.name}")
-            error(f"Error: {e}")
-            warning(
-                "Stopping directory processing. Fix issues and restart to continue."
+    # dir_key was resolved once above; completions reuse it
+    mark_complete = partial(state.mark_done, dir_key)
+    # Completions are journaled per prompt and folded into state.json once the
+    # run ends, whether it finished or stopped on a failure
+    with state.compacting():
+        if parallel > 1:
+            completed = _process_in_parallel(
+                remaining_files, project_config, mark_complete, parallel, verbose
             )
-            return
-        except Exception as e:
-            error(f"✗ Failed: {prompt_file.name}")
-            error(f"Unexpected error: {e}")
-            warning(
-                "Stopping directory processing. Fix issues and restart to continue."
+        else:
+            completed = _process_sequentially(
+                remaining_files, project_config, mark_complete, verbose, reuse_session
             )
-            return
+    if not completed:
+        return
 
     info(f"\n{'=' * 60}")
     info("All prompt files processed successfully!")
     info(f"{'=' * 60}")
 
 
+class _ExistingPath(click.ParamType):
+    """A path argument that must exist (or be "-"), checked with one stat() call.
+
+    Stands in for click.Path(exists=True, path_type=Path), which also runs its
+    readable/writable/type checks that vibe doesn't use.
+    """
+
+    name = "path"
+
+    def convert(
+        self,
+        value: str | Path,
+        param: click.Parameter | None,
+        ctx: click.Context | None,
+    ) -> Path:
+        path = Path(value)
+        if path == STDIN_PATH:
+            return path
+        try:
+            path.stat()
+        except OSError:
+            self.fail(
+                f"Path {click.format_filename(value)!r} does not exist.", param, ctx
+            )
+        return path
+
+    def shell_complete(
+        self,
+        ctx: click.Context,  # noqa: ARG002 - part of the ParamType interface
+        param: click.Parameter,  # noqa: ARG002 - part of the ParamType interface
+        incomplete: str,
+    ) -> list[CompletionItem]:
+        """Let the shell complete file and directory names, like click.Path."""
+        from click.shell_completion import CompletionItem  # noqa: PLC0415
+
+        return [CompletionItem(incomplete, type="file")]
+
+
+_EXISTING_PATH = _ExistingPath()
+
+
 @click.command()
-@click.argument("path", type=click.Path(exists=True, path_type=Path))
-def main(path: Path) -> None:
+@click.argument("path", type=_EXISTING_PATH)
+@click.option(
+    "-v", "--verbose", is_flag=True, help="Print the full JSON output from Claude."
+)
+@click.option(
+    "--reuse-session",
+    is_flag=True,
+    help="Send all prompts in a directory to one Claude process (shared conversation).",
+)
+@click.option(
+    "--parallel",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    metavar="K",
+    help="Run up to K prompts of a directory at once (for independent prompts).",
+)
+@click.option(
+    "--order",
+    type=click.Choice(["name", "mtime"]),
+    default="name",
+    show_default=True,
+    help="Process directory prompts by filename or by modification time.",
+)
+def main(
+    path: Path, verbose: bool, reuse_session: bool, parallel: int, order: str
+) -> None:
     """Invoke Claude Code headless with a prompt from a file or directory.
 
     If PATH is a file, reads the prompt from it, invokes claude with the prompt,
-    and prints the session ID and result.
+    and prints the session ID and result. If PATH is "-", the prompt is read
+    from stdin instead.
 
     If PATH is a directory, processes all .txt and .md files in the directory
     sequentially, running checks after each prompt. State is tracked to allow
-    resuming from incomplete prompts.
+    resuming from incomplete prompts. With --parallel, up to K prompts are sent
+    to Claude at once and checks run as each one finishes.
     """
-    if path.is_file():
-        success = _process_single_file(path)
+    if parallel > 1 and reuse_session:
+        fatal("--parallel cannot be combined with --reuse-session")
+
+    if path == STDIN_PATH or path.is_file():
+        success = _process_single_file(path, verbose=verbose)
         if not success:
             fatal("Processing failed", exit_code=1)
     elif path.is_dir():
-        _process_directory(path)
+        _process_directory(
+            path,
+            verbose=verbose,
+            reuse_session=reuse_session,
+            parallel=parallel,
+            order=order,
+        )
     else:
         fatal(f"Path must be a file or directory: {path}")
 
@@ -1,14 +1,16 @@
 """Project-specific configuration loading from .vibe/vibe.yaml."""
 
+from functools import lru_cache
 from pathlib import Path
 
-import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CheckStep(BaseModel):
     """A single check step configuration."""
 
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(description="Name of the check step")
     command: str = Field(description="Command to execute for this check")
 
@@ -16,29 +18,52 @@ class CheckStep(BaseModel):
 class ChecksConfig(BaseModel):
     """Configuration for checks section."""
 
+    model_config = ConfigDict(frozen=True)
+
     steps: list[CheckStep] = Field(
         default_factory=list, description="List of check steps"
     )
     max_retries: int = Field(default=10, description="Maximum number of retries")
+    max_concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        description="Maximum number of checks run in parallel (defaults to CPU count)",
+    )
+    base_delay: float = Field(
+        default=1.0, description="Initial backoff delay in seconds between retries"
+    )
+    max_delay: float = Field(
+        default=30.0, description="Maximum backoff delay in seconds between retries"
+    )
+    jitter: float = Field(
+        default=0.5, description="Random fraction added to each backoff delay"
+    )
 
 
 class ProjectConfig(BaseModel):
     """Root project configuration model.
 
-    Designed to be extensible for future custom logic sections.
+    Designed to be extensible for future custom logic sections. Instances are
+    frozen because loaded configs are cached and shared.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     checks: ChecksConfig | None = Field(
         default=None, description="Checks configuration"
     )
 
 
-def load_project_config() -> ProjectConfig | None:
+def load_project_config(config_path: Path | None = None) -> ProjectConfig | None:
     """Load project configuration from .vibe/vibe.yaml.
 
     Looks for the config file in the current working directory (where the command
     is run from), not where the vibe package is installed.
 
+    Args:
+        config_path: Path of the config file to load. Defaults to
+            .vibe/vibe.yaml in the current working directory.
+
     Returns:
         ProjectConfig instance if config file exists and is valid, None otherwise.
 
@@ -46,14 +71,38 @@ def load_project_config() -> ProjectConfig | None:
         yaml.YAMLError: If YAML parsing fails.
         ValueError: If config validation fails.
     """
-    config_path = Path.cwd() / ".vibe" / "vibe.yaml"
+    if config_path is None:
+        config_path = Path.cwd() / ".vibe" / "vibe.yaml"
 
-    if not config_path.exists():
+    try:
+        stat = config_path.stat()
+    except FileNotFoundError:
         return None
 
+    return _load_validated(str(config_path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=4)
+def _load_validated(
+    config_path: str,
+    mtime_ns: int,  # noqa: ARG001 - part of the cache key only
+    size: int,  # noqa: ARG001 - part of the cache key only
+) -> ProjectConfig:
+    """Parse and validate a config file.
+
+    Cached on the file's path, mtime and size, so an unchanged file is not
+    parsed or validated again within the same process.
+    """
+    # Deferred so importing the config models does not pull in the YAML parser
+    import yaml  # noqa: PLC0415
+
+    # The libyaml-backed loader is much faster, when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    # Read in one go and parse the raw bytes, so libyaml gets the whole buffer
+    # instead of pulling it through a Python-level text stream
+    data = Path(config_path).read_bytes()
     try:
-        with config_path.open(encoding="utf-8") as f:
-            config_data = yaml.safe_load(f)
+        config_data = yaml.load(data, Loader=loader)
     except yaml.YAMLError as e:
         msg = f"Failed to parse YAML config file {config_path}: {e}"
         raise yaml.YAMLError(msg) from e
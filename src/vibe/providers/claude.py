@@ -1,8 +1,19 @@
 """Claude provider implementation for invoking Claude CLI."""
 
+from __future__ import annotations
+
+import contextlib
 import json
+import re
 import subprocess
-from typing import Any
+import tempfile
+from typing import IO, TYPE_CHECKING, Any, Self
+
+from vibe import _json
+
+
+if TYPE_CHECKING:
+    from types import TracebackType
 
 
 class ClaudeError(Exception):
@@ -20,6 +31,20 @@ class ClaudeCommandNotFoundError(ClaudeError):
         super().__init__(message)
 
 
+# Substrings of claude stderr that indicate a temporary API-side failure
+TRANSIENT_ERROR_MARKERS = (
+    "rate limit",
+    "rate_limit",
+    "overloaded",
+)
+
+# Temporary HTTP statuses, only where stderr reports them as an API status, e.g.
+# "API Error: 429" or "HTTP 503"; a bare 429 may be a line number or a PID
+TRANSIENT_STATUS_PATTERN = re.compile(
+    r"\b(?:error|status|http)(?:\s+code)?\W{0,3}(?:429|503|529)\b"
+)
+
+
 class ClaudeCommandError(ClaudeError):
     """Raised when the claude command fails."""
 
@@ -28,6 +53,16 @@ class ClaudeCommandError(ClaudeError):
         self.stderr = stderr
         super().__init__(f"Claude command failed with exit code {returncode}")
 
+    @property
+    def is_transient(self) -> bool:
+        """Whether the failure looks temporary (rate limit, overload)."""
+        if not self.stderr:
+            return False
+        stderr = self.stderr.lower()
+        if any(marker in stderr for marker in TRANSIENT_ERROR_MARKERS):
+            return True
+        return TRANSIENT_STATUS_PATTERN.search(stderr) is not None
+
 
 class ClaudeJSONParseError(ClaudeError):
     """Raised when Claude output cannot be parsed as JSON."""
@@ -38,6 +73,15 @@ class ClaudeJSONParseError(ClaudeError):
         super().__init__(f"Failed to parse Claude output as JSON: {error}")
 
 
+# Tool permissions shared by single invocations and sessions
+TOOL_ARGS = ("--allowedTools", "'Bash,Read,Edit'", "--dangerously-skip-permissions")
+
+# The prompt goes through stdin rather than argv: no copy into the child's
+# argument block, and no E2BIG for very long prompts. That leaves the command
+# line constant, so it is built once here.
+INVOKE_COMMAND = ("claude", "-p", "--output-format", "json", *TOOL_ARGS)
+
+
 def invoke(prompt: str) -> dict[str, Any]:
     """Invoke Claude CLI with the given prompt and return parsed JSON output.
 
@@ -53,32 +97,173 @@ def invoke(prompt: str) -> dict[str, Any]:
         ClaudeCommandError: If the claude command fails.
         ClaudeJSONParseError: If the output cannot be parsed as JSON.
     """
-    command = [
-        "claude",
-        "-p",
-        prompt,
-        "--output-format",
-        "json",
-        "--allowedTools",
-        "'Bash,Read,Edit'",
-        "--dangerously-skip-permissions",
-    ]
-
-    # Invoke claude command
+    # Invoke claude command; output stays bytes so the JSON parser can take it
+    # as is, and is only decoded for error reporting
     try:
         result = subprocess.run(
-            command,
+            INVOKE_COMMAND,
+            input=prompt.encode("utf-8"),
             capture_output=True,
-            text=True,
             check=True,
         )
     except FileNotFoundError as e:
         raise ClaudeCommandNotFoundError from e
     except subprocess.CalledProcessError as e:
-        raise ClaudeCommandError(returncode=e.returncode, stderr=e.stderr) from e
+        stderr = e.stderr.decode("utf-8", errors="replace") if e.stderr else e.stderr
+        raise ClaudeCommandError(returncode=e.returncode, stderr=stderr) from e
 
     # Parse JSON output
     try:
-        return json.loads(result.stdout)
+        return _json.loads(result.stdout)
     except json.JSONDecodeError as e:
-        raise ClaudeJSONParseError(error=e, raw_output=result.stdout) from e
+        raw_output = result.stdout.decode("utf-8", errors="replace")
+        raise ClaudeJSONParseError(error=e, raw_output=raw_output) from e
+
+
+# Substrings of claude stderr showing that --input-format stream-json is not
+# supported by the installed CLI, e.g. "error: unknown option '--input-format'"
+STREAM_INPUT_UNSUPPORTED_MARKERS = ("--input-format", "stream-json")
+
+
+def _rejects_stream_input(stderr: str) -> bool:
+    """Whether claude exited because it doesn't support streamed input."""
+    return any(marker in stderr for marker in STREAM_INPUT_UNSUPPORTED_MARKERS)
+
+
+class InvokeSession:
+    """Send successive prompts to one long-lived claude process.
+
+    The process is started with stream-json input and output, so each prompt
+    is written as one JSON line on stdin and answered by a ``result`` event on
+    stdout. Prompts in a session share one conversation. If the installed CLI
+    does not support streaming input, the session falls back to calling
+    :func:`invoke` once per prompt.
+
+    Use as a context manager; the process is closed on exit.
+    """
+
+    command = (
+        "claude",
+        "-p",
+        "--input-format",
+        "stream-json",
+        "--output-format",
+        "stream-json",
+        "--verbose",
+        *TOOL_ARGS,
+    )
+
+    def __init__(self) -> None:
+        self._proc: subprocess.Popen[str] | None = None
+        self._stderr: IO[str] | None = None
+        self._answered = False
+        self._fallback = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _start(self) -> subprocess.Popen[str]:
+        # stderr goes to a temp file so a chatty process can't block on a full pipe
+        self._stderr = tempfile.TemporaryFile("w+", encoding="utf-8")  # noqa: SIM115
+        try:
+            return subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self._stderr,
+                text=True,
+                encoding="utf-8",
+            )
+        except FileNotFoundError as e:
+            raise ClaudeCommandNotFoundError from e
+
+    def _read_stderr(self) -> str:
+        if self._stderr is None:
+            return ""
+        self._stderr.seek(0)
+        return self._stderr.read()
+
+    def invoke(self, prompt: str) -> dict[str, Any]:
+        """Send a prompt to the session and return its ``result`` event.
+
+        Args:
+            prompt: The prompt text to send to Claude.
+
+        Returns:
+            The parsed ``result`` event, which carries the same keys as the
+            output of :func:`invoke` (e.g. 'session_id' and 'result').
+
+        Raises:
+            ClaudeCommandNotFoundError: If the 'claude' command is not found.
+            ClaudeCommandError: If the claude process exits before answering,
+                or answers with an error result.
+            ClaudeJSONParseError: If an output line cannot be parsed as JSON.
+                The process is closed, so the next prompt starts a new one.
+        """
+        if self._fallback:
+            return invoke(prompt)
+        if self._proc is None:
+            self._proc = self._start()
+
+        message = {"type": "user", "message": {"role": "user", "content": prompt}}
+        try:
+            self._proc.stdin.write(json.dumps(message) + "\n")
+            self._proc.stdin.flush()
+        except BrokenPipeError:
+            return self._handle_exit(prompt)
+
+        for line in self._proc.stdout:
+            if not line.strip():
+                continue
+            try:
+                event = _json.loads(line)
+            except json.JSONDecodeError as e:
+                # The rest of this prompt's events are still unread; drop the
+                # process so the next prompt can't be answered with them
+                self.close()
+                raise ClaudeJSONParseError(error=e, raw_output=line) from e
+            if event.get("type") == "result":
+                self._answered = True
+                if event.get("is_error"):
+                    # Per-call invoke sees this as a non-zero exit; match it
+                    raise ClaudeCommandError(
+                        returncode=1,
+                        stderr=event.get("result") or event.get("subtype"),
+                    )
+                return event
+        return self._handle_exit(prompt)
+
+    def _handle_exit(self, prompt: str) -> dict[str, Any]:
+        """Deal with the process exiting before it produced a result."""
+        returncode = self._proc.wait()
+        stderr = self._read_stderr()
+        self.close()
+        if not self._answered and _rejects_stream_input(stderr):
+            # This CLI can't take streamed prompts; use one process per prompt
+            self._fallback = True
+            return invoke(prompt)
+        raise ClaudeCommandError(returncode=returncode, stderr=stderr)
+
+    def close(self) -> None:
+        """Close stdin and wait for the claude process to exit."""
+        if self._proc is not None:
+            proc, self._proc = self._proc, None
+            if proc.stdin and not proc.stdin.closed:
+                with contextlib.suppress(BrokenPipeError):
+                    proc.stdin.close()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
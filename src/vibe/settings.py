@@ -2,19 +2,21 @@
 
 This module defines a Settings class and a cached accessor that
 loads configuration from environment variables and a .env file
-located at the project root.
+located at the project root. The module-level ``settings`` instance
+is created on first access, not at import time.
 """
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
 
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
-# Compute the project root (repo root), e.g.
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
+# Compute the project root (repo root) lexically; absolute() avoids the
+# per-component symlink resolution of resolve()
+PROJECT_ROOT = Path(__file__).absolute().parents[2]
 
 
 class Settings(BaseSettings):
@@ -38,6 +40,13 @@ class Settings(BaseSettings):
         default="INFO",
         description="Logging level.",
     )
+
+    @field_validator("log_level", mode="before")
+    @classmethod
+    def _normalize_log_level(cls, value: Any) -> Any:
+        """Accept level names in any case, e.g. LOG_LEVEL=info."""
+        return value.upper() if isinstance(value, str) else value
+
     # Pydantic v2 settings config
     model_config = SettingsConfigDict(
         # Read .env from the project root
@@ -47,6 +56,8 @@ class Settings(BaseSettings):
         env_prefix="",
         case_sensitive=False,
         extra="ignore",
+        # get_settings() shares one instance; it is never mutated
+        frozen=True,
     )
 
 
@@ -56,5 +67,9 @@ def get_settings() -> Settings:
     return Settings()
 
 
-# Convenient module-level instance
-settings: Settings = get_settings()
+def __getattr__(name: str) -> Any:
+    """Build the convenient module-level ``settings`` instance on first use."""
+    if name == "settings":
+        return get_settings()
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,166 @@
+"""Tracking of completed prompt files across directory runs."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+
+from vibe import _json
+from vibe.cli.utils import error, warning
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+# Completions between fsyncs of the state journal; see StateStore.mark_done
+JOURNAL_SYNC_INTERVAL = 10
+
+
+class StateStore:
+    """Completed prompt files per directory, loaded once and kept in memory.
+
+    ``state.json`` holds the compacted state, mapping resolved directory paths
+    to sorted lists of completed filenames. Completions made during a run are
+    appended to an append-only journal (``state.jsonl``) next to it, and
+    folded back into ``state.json`` by :meth:`compact`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Load the state from path and any journal left beside it.
+
+        Args:
+            path: Path to the state file.
+        """
+        self.path = path
+        self.journal_path = path.with_suffix(".jsonl")
+        self._completed = self._read_state_file()
+        self._replay_journal()
+
+    @classmethod
+    def for_cwd(cls) -> Self:
+        """Load the state file of the current directory (.vibe/state.json)."""
+        return cls(Path.cwd() / ".vibe" / "state.json")
+
+    def is_done(self, dir_key: str, filename: str) -> bool:
+        """Whether a prompt file of a directory is recorded as completed."""
+        return filename in self._completed.get(dir_key, ())
+
+    def _read_state_file(self) -> dict[str, set[str]]:
+        """Read the compacted state from state.json."""
+        try:
+            # One read and one parse pass over the whole (small) file
+            state = _json.loads(self.path.read_bytes())
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, Exception) as e:
+            warning(f"Failed to load state file: {e}. Starting fresh.")
+            return {}
+
+        # Validate structure; filenames are held as sets for O(1) lookups
+        if not isinstance(state, dict):
+            return {}
+        return {
+            dir_key: set(filenames)
+            for dir_key, filenames in state.items()
+            if isinstance(filenames, list)
+        }
+
+    def _replay_journal(self) -> None:
+        """Add completions recorded in the journal but not yet compacted."""
+        try:
+            with self.journal_path.open(encoding="utf-8") as f:
+                for line in f:
+                    # An interrupted append can leave a torn last line
+                    with contextlib.suppress(json.JSONDecodeError, KeyError, TypeError):
+                        entry = json.loads(line)
+                        self._completed.setdefault(entry["dir"], set()).add(
+                            entry["file"]
+                        )
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            warning(f"Failed to read state journal: {e}")
+
+    def mark_done(self, dir_key: str, filename: str) -> None:
+        """Mark a prompt file of a directory as completed and persist it.
+
+        The completion is appended to the journal rather than rewriting
+        state.json, so each prompt costs one small write. The journal is
+        fsynced every JOURNAL_SYNC_INTERVAL completions, and state.json when
+        it is compacted.
+
+        Args:
+            dir_key: The resolved directory containing the prompt file.
+            filename: The name of the completed prompt file.
+        """
+        completed = self._completed.setdefault(dir_key, set())
+        completed.add(filename)
+
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({"dir": dir_key, "file": filename}, separators=(",", ":"))
+        try:
+            with self.journal_path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                # Closing hands the line to the OS, which is enough to survive a
+                # crash or Ctrl-C of vibe itself; fsync only guards against
+                # losing the machine, so it is paid once per batch
+                if len(completed) % JOURNAL_SYNC_INTERVAL == 0:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except Exception as e:
+            error(f"Failed to record completed prompt file: {e}")
+
+    def save(self) -> bool:
+        """Write the whole state to state.json.
+
+        Returns:
+            True if the state was written, False otherwise.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = {
+            dir_key: sorted(filenames) for dir_key, filenames in self._completed.items()
+        }
+        # Write a sibling file and rename it over state.json, so a crash
+        # mid-write leaves the previous state intact rather than a truncated file
+        tmp_path = self.path.with_suffix(".json.tmp")
+        # Machine-read only; pretty-print just when debugging. Resolved before
+        # the temp file is opened, and invalid settings keep the compact form,
+        # so the state is saved whatever the environment holds.
+        from pydantic import ValidationError  # noqa: PLC0415
+
+        from vibe.settings import get_settings  # noqa: PLC0415
+
+        try:
+            debug = get_settings().debug
+        except ValidationError:
+            debug = False
+        dump_options = {"indent": 2} if debug else {"separators": (",", ":")}
+        try:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(data, f, **dump_options)
+                f.flush()
+                os.fsync(f.fileno())
+            tmp_path.replace(self.path)
+        except Exception as e:
+            error(f"Failed to save state file: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return False
+        return True
+
+    def compact(self) -> None:
+        """Fold the journal into state.json, then drop the journal."""
+        if self.journal_path.exists() and self.save():
+            self.journal_path.unlink(missing_ok=True)
+
+    @contextlib.contextmanager
+    def compacting(self) -> Iterator[Self]:
+        """Compact the state when the block exits, however it exits."""
+        try:
+            yield self
+        finally:
+            self.compact()
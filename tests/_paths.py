@@ -0,0 +1,16 @@
+"""Repository paths shared by the test modules."""
+
+from functools import lru_cache
+from pathlib import Path
+
+
+@lru_cache(maxsize=1)
+def project_root() -> Path:
+    """Return the repository root, resolved once per test session."""
+    return Path(__file__).resolve().parents[1]
+
+
+@lru_cache(maxsize=1)
+def src_path() -> Path:
+    """Return the source tree, for tests that spawn a fresh interpreter."""
+    return project_root() / "src"
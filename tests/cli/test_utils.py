@@ -1,17 +1,12 @@
 """Tests for CLI utilities."""
 
-from __future__ import annotations
-
-from typing import TYPE_CHECKING
+from pathlib import Path
 
 import pytest
 
-
-if TYPE_CHECKING:
-    from pathlib import Path
-
 from vibe.cli.utils import (
     NotInGitRepositoryError,
+    _log_threshold,
     error,
     fatal,
     find_project_root,
@@ -49,6 +44,56 @@ class TestPrintFunctions:
         captured = capsys.readouterr()
         assert "Test error" in captured.err
 
+    def test_plain_output_when_not_a_tty(self, capsys):
+        """Test messages are written without rich markup when piped."""
+        info("Plain [bold]info[/bold]")
+        error("Plain error")
+        captured = capsys.readouterr()
+        assert captured.out == "INFO: Plain [bold]info[/bold]\n"
+        assert captured.err == "ERROR: Plain error\n"
+
+    def test_rich_output_when_tty(self, capsys, monkeypatch):
+        """Test messages go through rich when attached to a terminal."""
+        monkeypatch.setattr("vibe.cli.utils._USE_RICH", True)
+        info("Styled [bold]info[/bold]")
+        captured = capsys.readouterr()
+        assert "INFO: Styled info" in captured.out
+
+    def test_messages_below_log_level_are_dropped(self, capsys, monkeypatch):
+        """Test that the log level threshold filters messages."""
+        monkeypatch.setattr("vibe.cli.utils._log_threshold", lambda: 30)
+        info("Hidden info")
+        success("Hidden success")
+        warning("Shown warning")
+        error("Shown error")
+        captured = capsys.readouterr()
+        assert captured.out == "WARNING: Shown warning\n"
+        assert captured.err == "ERROR: Shown error\n"
+
+    def test_fatal_ignores_log_level(self, capsys, monkeypatch):
+        """Test that fatal errors are printed at any log level."""
+        monkeypatch.setattr("vibe.cli.utils._log_threshold", lambda: 50)
+        with pytest.raises(SystemExit):
+            fatal("Always shown")
+        assert "Always shown" in capsys.readouterr().err
+
+    @pytest.mark.usefixtures("clear_settings_cache")
+    def test_log_level_is_case_insensitive(self, monkeypatch):
+        """Test that LOG_LEVEL accepts lower-case level names."""
+        monkeypatch.setenv("LOG_LEVEL", "warning")
+
+        assert _log_threshold() == 30
+
+    @pytest.mark.usefixtures("clear_settings_cache")
+    def test_invalid_log_level_falls_back_to_info(self, capsys, monkeypatch):
+        """Test that an unknown LOG_LEVEL doesn't break printing messages."""
+        monkeypatch.setenv("LOG_LEVEL", "VERBOSE")
+
+        info("Still shown")
+
+        assert _log_threshold() == 20
+        assert capsys.readouterr().out == "INFO: Still shown\n"
+
     def test_fatal(self, capsys):
         """Test fatal message printing and exit."""
         with pytest.raises(SystemExit) as exc_info:
@@ -104,3 +149,18 @@ class TestFindProjectRoot:
 
         result = find_project_root(start=subdir)
         assert result == tmp_path
+
+    def test_find_project_root_is_cached(self, tmp_path: Path, mocker):
+        """Test that repeated lookups from the same start reuse the first walk."""
+        git_dir = tmp_path / ".git"
+        git_dir.mkdir()
+        subdir = tmp_path / "subdir"
+        subdir.mkdir()
+        exists = mocker.spy(Path, "exists")
+
+        assert find_project_root(start=subdir) == tmp_path
+        walk_calls = exists.call_count
+        assert find_project_root(start=subdir) == tmp_path
+
+        assert walk_calls > 0
+        assert exists.call_count == walk_calls
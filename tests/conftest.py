@@ -0,0 +1,21 @@
+"""Fixtures shared by the whole test suite."""
+
+import pytest
+
+from vibe.cli.utils import reset_log_level
+from vibe.settings import get_settings
+
+
+@pytest.fixture(autouse=True)
+def default_log_level(monkeypatch):
+    """Run each test at LOG_LEVEL=INFO, whatever the caller's environment says."""
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    reset_log_level()
+
+
+@pytest.fixture
+def clear_settings_cache():
+    """Clear the get_settings LRU cache before and after a test using it."""
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
@@ -1,9 +1,9 @@
 """Tests for the Claude provider implementation."""
 
+import io
 import json
 import subprocess
-import sys
-from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -13,15 +13,14 @@ from vibe.providers.claude import (
     ClaudeCommandNotFoundError,
     ClaudeError,
     ClaudeJSONParseError,
+    InvokeSession,
     invoke,
 )
 
 
-# Ensure the package can be imported from the src/ layout during tests
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-SRC_PATH = PROJECT_ROOT / "src"
-if str(SRC_PATH) not in sys.path:
-    sys.path.insert(0, str(SRC_PATH))
+def _fake_result(stdout, stderr=b"", returncode=0):
+    """Build a stand-in for subprocess.CompletedProcess; invoke reads only these."""
+    return SimpleNamespace(stdout=stdout, stderr=stderr, returncode=returncode)
 
 
 def test_invoke_success():
@@ -32,29 +31,25 @@ def test_invoke_success():
     }
 
     with patch("subprocess.run") as mock_subprocess:
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_output)
-        mock_result.stderr = ""
-        mock_result.returncode = 0
-        mock_subprocess.return_value = mock_result
+        mock_subprocess.return_value = _fake_result(json.dumps(mock_output).encode())
 
         result = invoke("Test prompt")
 
         # Verify subprocess was called correctly
         mock_subprocess.assert_called_once()
         call_args = mock_subprocess.call_args
-        assert call_args[0][0] == [
+        assert call_args[0][0] == (
             "claude",
             "-p",
-            "Test prompt",
             "--output-format",
             "json",
             "--allowedTools",
             "'Bash,Read,Edit'",
             "--dangerously-skip-permissions",
-        ]
+        )
+        assert call_args[1]["input"] == b"Test prompt"
         assert call_args[1]["capture_output"] is True
-        assert call_args[1]["text"] is True
+        assert "text" not in call_args[1]
         assert call_args[1]["check"] is True
 
         # Verify output
@@ -73,17 +68,13 @@ def test_invoke_with_unicode_prompt():
     unicode_prompt = "Test prompt with unicode: 你好世界 🌍"
 
     with patch("subprocess.run") as mock_subprocess:
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_output)
-        mock_result.stderr = ""
-        mock_result.returncode = 0
-        mock_subprocess.return_value = mock_result
+        mock_subprocess.return_value = _fake_result(json.dumps(mock_output).encode())
 
         result = invoke(unicode_prompt)
 
         # Verify the prompt was passed correctly
         call_args = mock_subprocess.call_args
-        assert call_args[0][0][2] == unicode_prompt
+        assert call_args[1]["input"] == unicode_prompt.encode("utf-8")
         assert result == mock_output
 
 
@@ -94,11 +85,7 @@ def test_invoke_output_without_session_id():
     }
 
     with patch("subprocess.run") as mock_subprocess:
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_output)
-        mock_result.stderr = ""
-        mock_result.returncode = 0
-        mock_subprocess.return_value = mock_result
+        mock_subprocess.return_value = _fake_result(json.dumps(mock_output).encode())
 
         result = invoke("Test prompt")
 
@@ -114,11 +101,7 @@ def test_invoke_output_without_result():
     }
 
     with patch("subprocess.run") as mock_subprocess:
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_output)
-        mock_result.stderr = ""
-        mock_result.returncode = 0
-        mock_subprocess.return_value = mock_result
+        mock_subprocess.return_value = _fake_result(json.dumps(mock_output).encode())
 
         result = invoke("Test prompt")
 
@@ -132,11 +115,7 @@ def test_invoke_empty_output():
     mock_output = {}
 
     with patch("subprocess.run") as mock_subprocess:
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_output)
-        mock_result.stderr = ""
-        mock_result.returncode = 0
-        mock_subprocess.return_value = mock_result
+        mock_subprocess.return_value = _fake_result(json.dumps(mock_output).encode())
 
         result = invoke("Test prompt")
 
@@ -162,7 +141,7 @@ def test_invoke_command_failure():
         mock_subprocess.side_effect = subprocess.CalledProcessError(
             returncode=1,
             cmd=["claude"],
-            stderr="Claude error message",
+            stderr=b"Claude error message",
         )
 
         with pytest.raises(ClaudeCommandError) as exc_info:
@@ -194,11 +173,7 @@ def test_invoke_command_failure_no_stderr():
 def test_invoke_invalid_json():
     """Test that ClaudeJSONParseError is raised when output is invalid JSON."""
     with patch("subprocess.run") as mock_subprocess:
-        mock_result = MagicMock()
-        mock_result.stdout = "Invalid JSON output"
-        mock_result.stderr = ""
-        mock_result.returncode = 0
-        mock_subprocess.return_value = mock_result
+        mock_subprocess.return_value = _fake_result(b"Invalid JSON output")
 
         with pytest.raises(ClaudeJSONParseError) as exc_info:
             invoke("Test prompt")
@@ -212,11 +187,9 @@ def test_invoke_invalid_json():
 def test_invoke_malformed_json():
     """Test ClaudeJSONParseError with malformed JSON."""
     with patch("subprocess.run") as mock_subprocess:
-        mock_result = MagicMock()
-        mock_result.stdout = '{"session_id": "test", "result": }'
-        mock_result.stderr = ""
-        mock_result.returncode = 0
-        mock_subprocess.return_value = mock_result
+        mock_subprocess.return_value = _fake_result(
+            b'{"session_id": "test", "result": }'
+        )
 
         with pytest.raises(ClaudeJSONParseError) as exc_info:
             invoke("Test prompt")
@@ -229,11 +202,7 @@ def test_invoke_malformed_json():
 def test_invoke_empty_stdout():
     """Test ClaudeJSONParseError when stdout is empty."""
     with patch("subprocess.run") as mock_subprocess:
-        mock_result = MagicMock()
-        mock_result.stdout = ""
-        mock_result.stderr = ""
-        mock_result.returncode = 0
-        mock_subprocess.return_value = mock_result
+        mock_subprocess.return_value = _fake_result(b"")
 
         with pytest.raises(ClaudeJSONParseError) as exc_info:
             invoke("Test prompt")
@@ -250,6 +219,31 @@ def test_claude_command_error_attributes():
     assert "Claude command failed with exit code 42" in str(error)
 
 
+def test_claude_command_error_is_transient():
+    """Test that rate-limit and overload failures are reported as transient."""
+    assert ClaudeCommandError(returncode=1, stderr="API Error: 429").is_transient
+    assert ClaudeCommandError(returncode=1, stderr="Rate limit hit").is_transient
+    assert ClaudeCommandError(returncode=1, stderr="Overloaded").is_transient
+    assert not ClaudeCommandError(returncode=1, stderr="Invalid API key").is_transient
+    assert not ClaudeCommandError(returncode=1, stderr=None).is_transient
+
+
+@pytest.mark.parametrize(
+    ("stderr", "transient"),
+    [
+        ("HTTP 503 Service Unavailable", True),
+        ("Request failed with status code 529", True),
+        ('File "cli.py", line 429, in main', False),
+        ("wrote 15290 bytes", False),
+        ("worker pid 503 exited", False),
+        ("Error: invalid model at 2024-05-29T12:00:00", False),
+    ],
+)
+def test_claude_command_error_status_codes(stderr, transient):
+    """Test that status codes only count as transient when reported as one."""
+    assert ClaudeCommandError(returncode=1, stderr=stderr).is_transient is transient
+
+
 def test_claude_json_parse_error_attributes():
     """Test ClaudeJSONParseError exception attributes."""
     json_error = json.JSONDecodeError("Expecting value", "test", 0)
@@ -279,14 +273,165 @@ def test_invoke_complex_json_output():
     }
 
     with patch("subprocess.run") as mock_subprocess:
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_output)
-        mock_result.stderr = ""
-        mock_result.returncode = 0
-        mock_subprocess.return_value = mock_result
+        mock_subprocess.return_value = _fake_result(json.dumps(mock_output).encode())
 
         result = invoke("Test prompt")
 
         assert result == mock_output
         assert result["metadata"]["timestamp"] == "2024-01-01T00:00:00Z"
         assert result["items"] == [1, 2, 3]
+
+
+def _fake_session_process(stdout_lines, returncode=0):
+    """Build a stand-in for a streaming claude process."""
+    proc = MagicMock()
+    proc.stdin = io.StringIO()
+    proc.stdout = io.StringIO("".join(line + "\n" for line in stdout_lines))
+    proc.wait.return_value = returncode
+    return proc
+
+
+def test_invoke_session_reuses_one_process():
+    """Test that a session answers several prompts from one claude process."""
+    events = [
+        json.dumps({"type": "system", "subtype": "init"}),
+        json.dumps({"type": "result", "session_id": "s1", "result": "first"}),
+        json.dumps({"type": "result", "session_id": "s1", "result": "second"}),
+    ]
+    proc = _fake_session_process(events)
+
+    with (
+        patch("subprocess.Popen", return_value=proc) as mock_popen,
+        InvokeSession() as session,
+    ):
+        first = session.invoke("Prompt one")
+        written = proc.stdin.getvalue()
+        second = session.invoke("Prompt two")
+
+    mock_popen.assert_called_once()
+    assert mock_popen.call_args[0][0][:6] == (
+        "claude",
+        "-p",
+        "--input-format",
+        "stream-json",
+        "--output-format",
+        "stream-json",
+    )
+    assert first["result"] == "first"
+    assert second["result"] == "second"
+    message = json.loads(written)
+    assert message["message"] == {"role": "user", "content": "Prompt one"}
+
+
+def _popen_with_stderr(proc, stderr):
+    """Build a Popen stand-in that writes stderr to the session's stderr file."""
+
+    def popen(*_args, **kwargs):
+        kwargs["stderr"].write(stderr)
+        return proc
+
+    return popen
+
+
+def test_invoke_session_falls_back_when_streaming_unsupported():
+    """Test that a session uses per-call invoke if streamed input is rejected."""
+    proc = _fake_session_process([], returncode=1)
+    popen = _popen_with_stderr(proc, "error: unknown option '--input-format'\n")
+
+    with (
+        patch("subprocess.Popen", side_effect=popen),
+        patch(
+            "vibe.providers.claude.invoke", return_value={"result": "ok"}
+        ) as mock_invoke,
+        InvokeSession() as session,
+    ):
+        assert session.invoke("Prompt one") == {"result": "ok"}
+        assert session.invoke("Prompt two") == {"result": "ok"}
+
+    assert mock_invoke.call_count == 2
+
+
+def test_invoke_session_process_exit_before_answer():
+    """Test that a session raises, not falls back, on other early exits."""
+    proc = _fake_session_process([], returncode=1)
+    popen = _popen_with_stderr(proc, "Error: Invalid API key\n")
+
+    with (
+        patch("subprocess.Popen", side_effect=popen),
+        patch("vibe.providers.claude.invoke") as mock_invoke,
+        InvokeSession() as session,
+        pytest.raises(ClaudeCommandError) as exc_info,
+    ):
+        session.invoke("Prompt one")
+
+    mock_invoke.assert_not_called()
+    assert exc_info.value.returncode == 1
+    assert "Invalid API key" in exc_info.value.stderr
+
+
+def test_invoke_session_error_result():
+    """Test that an error result event raises instead of counting as success."""
+    events = [
+        json.dumps(
+            {
+                "type": "result",
+                "subtype": "error_during_execution",
+                "is_error": True,
+                "result": "API Error: 529 overloaded",
+            }
+        ),
+        json.dumps({"type": "result", "result": "second"}),
+    ]
+    proc = _fake_session_process(events)
+
+    with patch("subprocess.Popen", return_value=proc), InvokeSession() as session:
+        with pytest.raises(ClaudeCommandError) as exc_info:
+            session.invoke("Prompt one")
+        # The process keeps serving the session after an error result
+        assert session.invoke("Prompt two")["result"] == "second"
+
+    assert exc_info.value.stderr == "API Error: 529 overloaded"
+    assert exc_info.value.is_transient
+
+
+def test_invoke_session_restarts_after_parse_error():
+    """Test that a bad line drops the process and its unread events."""
+    stale = _fake_session_process(
+        ["not json", json.dumps({"type": "result", "result": "stale"})]
+    )
+    fresh = _fake_session_process([json.dumps({"type": "result", "result": "fresh"})])
+
+    with (
+        patch("subprocess.Popen", side_effect=[stale, fresh]) as mock_popen,
+        InvokeSession() as session,
+    ):
+        with pytest.raises(ClaudeJSONParseError):
+            session.invoke("Prompt one")
+        second = session.invoke("Prompt two")
+
+    assert second["result"] == "fresh"
+    assert mock_popen.call_count == 2
+    assert stale.stdin.closed
+
+
+def test_invoke_session_process_exit_after_answer():
+    """Test that a session raises if the process dies after answering."""
+    events = [json.dumps({"type": "result", "result": "first"})]
+    proc = _fake_session_process(events, returncode=2)
+
+    with patch("subprocess.Popen", return_value=proc), InvokeSession() as session:
+        session.invoke("Prompt one")
+        with pytest.raises(ClaudeCommandError) as exc_info:
+            session.invoke("Prompt two")
+
+    assert exc_info.value.returncode == 2
+
+
+def test_invoke_session_command_not_found():
+    """Test that a session reports a missing claude command."""
+    with (
+        patch("subprocess.Popen", side_effect=FileNotFoundError()),
+        InvokeSession() as session,
+        pytest.raises(ClaudeCommandNotFoundError),
+    ):
+        session.invoke("Prompt")
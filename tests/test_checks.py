@@ -1,9 +1,22 @@
 """Unit tests for vibe.checks module."""
 
+import io
 import json
+import shlex
+import subprocess
+import threading
+import time
+import tracemalloc
 from unittest.mock import MagicMock, patch
 
-from vibe.checks import CheckResult, run_check, run_checks_with_retry
+import pytest
+
+from vibe.checks import (
+    MAX_OUTPUT_BYTES,
+    CheckResult,
+    run_check,
+    run_checks_with_retry,
+)
 from vibe.project_config import ChecksConfig, CheckStep
 from vibe.providers.claude import (
     ClaudeCommandError,
@@ -12,6 +25,46 @@ from vibe.providers.claude import (
 )
 
 
+# Claude errors raised by the mocked fix invocation; built once and reused
+_CLAUDE_NOT_FOUND = ClaudeCommandNotFoundError()
+_CLAUDE_FAILED = ClaudeCommandError(returncode=1, stderr="Claude error")
+_CLAUDE_JSON_ERR = ClaudeJSONParseError(
+    error=json.JSONDecodeError("Invalid JSON", "test", 0), raw_output="invalid json"
+)
+
+
+def _run_check_by_command(results):
+    """Build a run_check side_effect that answers each step from its own list.
+
+    results maps a step's command to the CheckResults of its successive runs.
+    Steps run concurrently, so results are keyed on the step, not call order.
+    """
+    pending = {command: list(step_results) for command, step_results in results.items()}
+
+    def fake_run_check(step):
+        return pending[step.command].pop(0)
+
+    return fake_run_check
+
+
+@pytest.fixture(scope="module")
+def single_check_config():
+    """One "make test" step with three retries, shared as the model is frozen."""
+    return ChecksConfig(
+        steps=[CheckStep(name="test", command="make test")], max_retries=3
+    )
+
+
+@pytest.fixture
+def mocked_checks(monkeypatch):
+    """Replace run_check and the Claude fix call; returns both mocks."""
+    run_check_mock = MagicMock()
+    invoke_mock = MagicMock()
+    monkeypatch.setattr("vibe.checks.run_check", run_check_mock)
+    monkeypatch.setattr("vibe.checks.invoke_claude", invoke_mock)
+    return run_check_mock, invoke_mock
+
+
 def test_check_result_dataclass():
     """Test CheckResult dataclass creation."""
     result = CheckResult(
@@ -32,81 +85,218 @@ def test_check_result_dataclass():
     assert result_with_error.error == "Lint errors found"
 
 
-def test_run_check_success():
-    """Test run_check with successful command execution."""
-    step = CheckStep(name="test", command="echo success")
+class FakeProcess:
+    """Stand-in for a finished subprocess.Popen, with its output in memory."""
 
-    with patch("subprocess.run") as mock_run:
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "success output"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+    def __init__(self, completed):
+        self.stdout = io.BytesIO(completed.stdout)
+        self.stderr = io.BytesIO(completed.stderr)
+        self.returncode = completed.returncode
 
-        result = run_check(step)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stdout.close()
+        self.stderr.close()
+
+    def wait(self):
+        return self.returncode
+
+
+class FakeSubprocess:
+    """In-process stand-in for subprocess.Popen, answering registered commands.
+
+    Commands are looked up by their command string; argument lists are joined
+    back with shlex.join. Every call is recorded in ``calls``.
+    """
 
-        assert result.success is True
-        assert result.step_name == "test"
-        assert result.output == "success output"
-        assert result.error is None
-        mock_run.assert_called_once_with(
-            "echo success",
-            shell=True,
-            capture_output=True,
-            text=True,
-            check=False,
+    def __init__(self):
+        self._results = {}
+        self.calls = []
+
+    def register(self, command, returncode=0, stdout=b"", stderr=b""):
+        """Answer command with the given exit status and output."""
+        self._results[command] = subprocess.CompletedProcess(
+            command, returncode, stdout, stderr
         )
 
+    def register_error(self, command, exc):
+        """Make running command raise exc."""
+        self._results[command] = exc
+
+    def popen(self, args, **kwargs):
+        """Record the call and return or raise the registered outcome."""
+        self.calls.append((args, kwargs))
+        command = args if isinstance(args, str) else shlex.join(args)
+        result = self._results[command]
+        if isinstance(result, BaseException):
+            raise result
+        return FakeProcess(result)
+
+
+# Keyword arguments run_check passes to Popen besides shell
+_PIPES = {"stdout": subprocess.PIPE, "stderr": subprocess.PIPE}
+
+
+@pytest.fixture
+def fake_subprocess(monkeypatch):
+    """Route run_check's subprocess.Popen calls to a FakeSubprocess."""
+    fake = FakeSubprocess()
+    monkeypatch.setattr("vibe.checks.subprocess.Popen", fake.popen)
+    return fake
 
-def test_run_check_failure():
-    """Test run_check with failing command execution."""
+
+def _make_test_result(success, output, error=None):
+    """Expected run_check result for the "make test" step."""
+    return CheckResult(
+        success=success,
+        step_name="test",
+        output=output,
+        error=error,
+        command="make test",
+    )
+
+
+@pytest.mark.parametrize(
+    ("completed", "expected"),
+    [
+        # (returncode, stdout, stderr) of the command
+        pytest.param(
+            (0, b"success output", b""),
+            _make_test_result(True, "success output"),
+            id="ok",
+        ),
+        pytest.param(
+            (1, b"", b"Test failures found"),
+            _make_test_result(False, "", "Test failures found"),
+            id="failure",
+        ),
+        pytest.param(
+            (2, b"Some lint output", b"Lint errors"),
+            _make_test_result(False, "Some lint output", "Lint errors"),
+            id="failure_with_stdout",
+        ),
+    ],
+)
+def test_run_check_result(fake_subprocess, monkeypatch, completed, expected):
+    """Test that run_check turns the command's exit status and output into a result."""
     step = CheckStep(name="test", command="make test")
+    monkeypatch.setattr("vibe.checks.shutil.which", lambda _: "/usr/bin/make")
+    fake_subprocess.register("make test", *completed)
+
+    assert run_check(step) == expected
+    assert fake_subprocess.calls == [(["make", "test"], {"shell": False, **_PIPES})]
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        "make test | tee log",
+        "cd src && make test",
+        "make test > out.txt",
+        "echo $HOME",
+        "ruff check src/*.py",
+        "FOO=1 make test",
+        "exit 1",
+    ],
+)
+def test_run_check_uses_shell_when_needed(command, fake_subprocess, monkeypatch):
+    """Test that commands needing shell features still run through the shell."""
+    step = CheckStep(name="test", command=command)
 
-    with patch("subprocess.run") as mock_run:
-        mock_result = MagicMock()
-        mock_result.returncode = 1
-        mock_result.stdout = ""
-        mock_result.stderr = "Test failures found"
-        mock_run.return_value = mock_result
+    def which(program):
+        return None if program == "exit" else f"/usr/bin/{program}"
 
-        result = run_check(step)
+    monkeypatch.setattr("vibe.checks.shutil.which", which)
+    fake_subprocess.register(command)
 
-        assert result.success is False
-        assert result.step_name == "test"
-        assert result.output == ""
-        assert result.error == "Test failures found"
+    run_check(step)
 
+    assert fake_subprocess.calls == [(command, {"shell": True, **_PIPES})]
+
+
+def test_run_check_splits_quoted_arguments(fake_subprocess, monkeypatch):
+    """Test that quoted arguments are split without a shell."""
+    step = CheckStep(name="test", command="pytest -k 'not slow' tests")
+    monkeypatch.setattr("vibe.checks.shutil.which", lambda _: "/usr/bin/pytest")
+    fake_subprocess.register(step.command)
+
+    run_check(step)
+
+    [(args, kwargs)] = fake_subprocess.calls
+    assert args == ["pytest", "-k", "not slow", "tests"]
+    assert kwargs["shell"] is False
+
+
+@pytest.mark.parametrize("earlier", [9, 10 * MAX_OUTPUT_BYTES + 9])
+def test_run_check_truncates_large_output(fake_subprocess, earlier):
+    """Test run_check keeps only the tail of very large output."""
+    step = CheckStep(name="test", command="make test")
+    stderr = b"x" * (MAX_OUTPUT_BYTES + earlier - 9) + b"last line"
+    fake_subprocess.register("make test", returncode=1, stderr=stderr)
 
-def test_run_check_failure_with_stdout():
-    """Test run_check with failing command that has stdout."""
-    step = CheckStep(name="lint", command="make lint")
+    result = run_check(step)
 
-    with patch("subprocess.run") as mock_run:
-        mock_result = MagicMock()
-        mock_result.returncode = 2
-        mock_result.stdout = "Some lint output"
-        mock_result.stderr = "Lint errors"
-        mock_run.return_value = mock_result
+    assert result.error.endswith("last line")
+    assert f"({earlier} bytes of earlier output truncated)" in result.error
+    assert len(result.error) < MAX_OUTPUT_BYTES + 100
 
+
+def test_run_check_output_memory_bounded(monkeypatch):
+    """Test that reading very large output never holds much more than its tail."""
+    step = CheckStep(name="test", command="make test")
+    chunk = b"x" * 8192
+
+    class EndlessPipe(io.RawIOBase):
+        """Yields 20 * MAX_OUTPUT_BYTES of output without ever holding it."""
+
+        def __init__(self):
+            self.left = 20 * MAX_OUTPUT_BYTES
+
+        def read(self, size=-1):
+            n = min(size, len(chunk), self.left)
+            self.left -= n
+            return chunk[:n]
+
+    proc = MagicMock(stdout=EndlessPipe(), stderr=io.BytesIO())
+    proc.__enter__.return_value = proc
+    proc.wait.return_value = 0
+    monkeypatch.setattr("vibe.checks.subprocess.Popen", MagicMock(return_value=proc))
+
+    tracemalloc.start()
+    try:
         result = run_check(step)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
 
-        assert result.success is False
-        assert result.error == "Lint errors"
+    assert f"({19 * MAX_OUTPUT_BYTES} bytes of earlier output" in result.output
+    assert peak < 4 * MAX_OUTPUT_BYTES
+
+
+def test_run_check_invalid_utf8_output(fake_subprocess):
+    """Test run_check replaces undecodable bytes instead of failing."""
+    step = CheckStep(name="test", command="make test")
+    fake_subprocess.register("make test", stdout=b"ok \xff")
+
+    result = run_check(step)
+
+    assert result.success is True
+    assert result.output == "ok \ufffd"
 
 
-def test_run_check_exception():
+def test_run_check_exception(fake_subprocess):
     """Test run_check when subprocess raises an exception."""
     step = CheckStep(name="test", command="nonexistent-command")
+    fake_subprocess.register_error(step.command, Exception("Command not found"))
 
-    with patch("subprocess.run") as mock_run:
-        mock_run.side_effect = Exception("Command not found")
+    result = run_check(step)
 
-        result = run_check(step)
-
-        assert result.success is False
-        assert result.step_name == "test"
-        assert result.output == ""
-        assert "Command not found" in result.error
+    assert result.success is False
+    assert result.step_name == "test"
+    assert result.output == ""
+    assert "Command not found" in result.error
 
 
 def test_run_checks_with_retry_no_steps():
@@ -127,10 +317,16 @@ def test_run_checks_with_retry_all_pass_first_try():
     config = ChecksConfig(steps=steps, max_retries=3)
 
     with patch("vibe.checks.run_check") as mock_run_check:
-        mock_run_check.side_effect = [
-            CheckResult(success=True, step_name="test", output="test passed"),
-            CheckResult(success=True, step_name="lint", output="lint passed"),
-        ]
+        mock_run_check.side_effect = _run_check_by_command(
+            {
+                "echo test": [
+                    CheckResult(success=True, step_name="test", output="test passed")
+                ],
+                "echo lint": [
+                    CheckResult(success=True, step_name="lint", output="lint passed")
+                ],
+            }
+        )
 
         results = run_checks_with_retry(config)
 
@@ -139,57 +335,87 @@ def test_run_checks_with_retry_all_pass_first_try():
         assert mock_run_check.call_count == 2
 
 
-def test_run_checks_with_retry_failure_then_success():
-    """Test run_checks_with_retry with failure then success after Claude fix."""
-    steps = [CheckStep(name="test", command="make test")]
-    config = ChecksConfig(steps=steps, max_retries=3)
+def test_run_checks_with_retry_runs_checks_in_parallel():
+    """Test that checks run concurrently and results keep step order."""
+    steps = [
+        CheckStep(name="slow", command="make slow"),
+        CheckStep(name="fast", command="make fast"),
+    ]
+    config = ChecksConfig(steps=steps, max_retries=0, max_concurrency=2)
 
-    with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
-    ):
-        # First attempt: failure
-        # Second attempt: success
-        mock_run_check.side_effect = [
-            CheckResult(
-                success=False, step_name="test", output="", error="Tests failed"
-            ),
-            CheckResult(success=True, step_name="test", output="All tests passed"),
-        ]
+    def fake_run_check(step):
+        if step.name == "slow":
+            time.sleep(0.05)
+        return CheckResult(success=True, step_name=step.name, output="")
 
+    with patch("vibe.checks.run_check", side_effect=fake_run_check):
         results = run_checks_with_retry(config)
 
-        assert len(results) == 1
-        assert results[0].success is True
-        assert mock_run_check.call_count == 2
-        assert mock_invoke.call_count == 1
+    assert [r.step_name for r in results] == ["slow", "fast"]
+
+
+def test_run_checks_with_retry_max_concurrency_one_runs_sequentially():
+    """Test that max_concurrency=1 runs checks in the calling thread."""
+    steps = [
+        CheckStep(name="test", command="make test"),
+        CheckStep(name="lint", command="make lint"),
+    ]
+    config = ChecksConfig(steps=steps, max_retries=0, max_concurrency=1)
+    threads = []
 
+    def fake_run_check(step):
+        threads.append(threading.current_thread())
+        return CheckResult(success=True, step_name=step.name, output="")
 
-def test_run_checks_with_retry_max_retries_reached():
+    with patch("vibe.checks.run_check", side_effect=fake_run_check):
+        results = run_checks_with_retry(config)
+
+    assert [r.step_name for r in results] == ["test", "lint"]
+    assert threads == [threading.main_thread()] * 2
+
+
+def test_run_checks_with_retry_failure_then_success(single_check_config, mocked_checks):
+    """Test run_checks_with_retry with failure then success after Claude fix."""
+    mock_run_check, mock_invoke = mocked_checks
+
+    # First attempt: failure
+    # Second attempt: success
+    mock_run_check.side_effect = [
+        CheckResult(success=False, step_name="test", output="", error="Tests failed"),
+        CheckResult(success=True, step_name="test", output="All tests passed"),
+    ]
+
+    results = run_checks_with_retry(single_check_config)
+
+    assert len(results) == 1
+    assert results[0].success is True
+    assert mock_run_check.call_count == 2
+    assert mock_invoke.call_count == 1
+
+
+def test_run_checks_with_retry_max_retries_reached(mocked_checks):
     """Test run_checks_with_retry when max retries is reached."""
     steps = [CheckStep(name="test", command="make test")]
     config = ChecksConfig(steps=steps, max_retries=2)
 
-    with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
-    ):
-        # Always fail
-        mock_run_check.return_value = CheckResult(
-            success=False, step_name="test", output="", error="Tests failed"
-        )
+    mock_run_check, mock_invoke = mocked_checks
 
-        results = run_checks_with_retry(config)
+    # Always fail
+    mock_run_check.return_value = CheckResult(
+        success=False, step_name="test", output="", error="Tests failed"
+    )
 
-        assert len(results) == 1
-        assert results[0].success is False
-        # Should try 3 times: initial + 2 retries
-        assert mock_run_check.call_count == 3
-        # Should call Claude 2 times (for retries 1 and 2)
-        assert mock_invoke.call_count == 2
+    results = run_checks_with_retry(config)
+
+    assert len(results) == 1
+    assert results[0].success is False
+    # Should try 3 times: initial + 2 retries
+    assert mock_run_check.call_count == 3
+    # Should call Claude 2 times (for retries 1 and 2)
+    assert mock_invoke.call_count == 2
 
 
-def test_run_checks_with_retry_multiple_checks_mixed_results():
+def test_run_checks_with_retry_multiple_checks_mixed_results(mocked_checks):
     """Test run_checks_with_retry with multiple checks having mixed results."""
     steps = [
         CheckStep(name="test", command="make test"),
@@ -197,99 +423,141 @@ def test_run_checks_with_retry_multiple_checks_mixed_results():
     ]
     config = ChecksConfig(steps=steps, max_retries=3)
 
-    with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
-    ):
-        # First attempt: test passes, lint fails
-        # Second attempt: both pass
-        mock_run_check.side_effect = [
-            CheckResult(success=True, step_name="test", output="test passed"),
-            CheckResult(
-                success=False, step_name="lint", output="", error="Lint errors"
-            ),
-            CheckResult(success=True, step_name="test", output="test passed"),
-            CheckResult(success=True, step_name="lint", output="lint passed"),
-        ]
+    mock_run_check, mock_invoke = mocked_checks
+
+    # First attempt: test passes, lint fails
+    # Second attempt: both pass
+    mock_run_check.side_effect = _run_check_by_command(
+        {
+            "make test": [
+                CheckResult(success=True, step_name="test", output="test passed"),
+                CheckResult(success=True, step_name="test", output="test passed"),
+            ],
+            "make lint": [
+                CheckResult(
+                    success=False, step_name="lint", output="", error="Lint errors"
+                ),
+                CheckResult(success=True, step_name="lint", output="lint passed"),
+            ],
+        }
+    )
 
-        results = run_checks_with_retry(config)
+    results = run_checks_with_retry(config)
 
-        assert len(results) == 2
-        assert all(r.success for r in results)
-        assert mock_run_check.call_count == 4
-        assert mock_invoke.call_count == 1
+    assert len(results) == 2
+    assert all(r.success for r in results)
+    assert mock_run_check.call_count == 4
+    assert mock_invoke.call_count == 1
 
 
-def test_run_checks_with_retry_claude_command_not_found():
+def test_run_checks_with_retry_claude_command_not_found(
+    single_check_config, mocked_checks
+):
     """Test run_checks_with_retry when Claude command is not found during fix."""
-    steps = [CheckStep(name="test", command="make test")]
-    config = ChecksConfig(steps=steps, max_retries=3)
+    mock_run_check, mock_invoke = mocked_checks
 
-    with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
-    ):
-        mock_run_check.return_value = CheckResult(
-            success=False, step_name="test", output="", error="Tests failed"
-        )
-        mock_invoke.side_effect = ClaudeCommandNotFoundError()
+    mock_run_check.return_value = CheckResult(
+        success=False, step_name="test", output="", error="Tests failed"
+    )
+    mock_invoke.side_effect = _CLAUDE_NOT_FOUND
 
-        results = run_checks_with_retry(config)
+    results = run_checks_with_retry(single_check_config)
 
-        assert len(results) == 1
-        assert results[0].success is False
-        assert mock_invoke.call_count == 1
+    assert len(results) == 1
+    assert results[0].success is False
+    assert mock_invoke.call_count == 1
 
 
-def test_run_checks_with_retry_claude_command_error():
+def test_run_checks_with_retry_claude_command_error(single_check_config, mocked_checks):
     """Test run_checks_with_retry when Claude command fails during fix."""
+    mock_run_check, mock_invoke = mocked_checks
+
+    mock_run_check.return_value = CheckResult(
+        success=False, step_name="test", output="", error="Tests failed"
+    )
+    mock_invoke.side_effect = _CLAUDE_FAILED
+
+    results = run_checks_with_retry(single_check_config)
+
+    assert len(results) == 1
+    assert results[0].success is False
+    assert mock_invoke.call_count == 1
+
+
+def test_run_checks_with_retry_backs_off_on_transient_claude_error(mocked_checks):
+    """Test that a transient Claude failure is retried after a backoff delay."""
     steps = [CheckStep(name="test", command="make test")]
-    config = ChecksConfig(steps=steps, max_retries=3)
+    config = ChecksConfig(steps=steps, max_retries=3, base_delay=2.0, max_delay=30.0)
+
+    mock_run_check, mock_invoke = mocked_checks
 
     with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
+        patch("vibe.checks.random.random", return_value=0.0),
+        patch("vibe.checks.time.sleep") as mock_sleep,
     ):
-        mock_run_check.return_value = CheckResult(
-            success=False, step_name="test", output="", error="Tests failed"
-        )
-        mock_invoke.side_effect = ClaudeCommandError(
-            returncode=1, stderr="Claude error"
-        )
+        mock_run_check.side_effect = [
+            CheckResult(
+                success=False, step_name="test", output="", error="Tests failed"
+            ),
+            CheckResult(success=True, step_name="test", output="All tests passed"),
+        ]
+        mock_invoke.side_effect = [
+            ClaudeCommandError(returncode=1, stderr="API Error: 429 rate limit"),
+            {"result": "fixed"},
+        ]
 
         results = run_checks_with_retry(config)
 
-        assert len(results) == 1
-        assert results[0].success is False
-        assert mock_invoke.call_count == 1
+        assert results[0].success is True
+        assert mock_invoke.call_count == 2
+        # Nothing changed after the failed call, so the checks are not re-run
+        assert mock_run_check.call_count == 2
+        mock_sleep.assert_called_once_with(2.0)
 
 
-def test_run_checks_with_retry_claude_json_parse_error():
-    """Test run_checks_with_retry when Claude JSON parsing fails during fix."""
+def test_run_checks_with_retry_backoff_capped_at_max_delay(mocked_checks):
+    """Test that the backoff delay never exceeds max_delay."""
     steps = [CheckStep(name="test", command="make test")]
-    config = ChecksConfig(steps=steps, max_retries=3)
+    config = ChecksConfig(steps=steps, max_retries=3, base_delay=10.0, max_delay=15.0)
 
-    with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
-    ):
+    mock_run_check, mock_invoke = mocked_checks
+
+    with patch("vibe.checks.time.sleep") as mock_sleep:
         mock_run_check.return_value = CheckResult(
             success=False, step_name="test", output="", error="Tests failed"
         )
+        mock_invoke.side_effect = ClaudeCommandError(returncode=1, stderr="Overloaded")
 
-        json_error = json.JSONDecodeError("Invalid JSON", "test", 0)
-        mock_invoke.side_effect = ClaudeJSONParseError(
-            error=json_error, raw_output="invalid json"
-        )
+        run_checks_with_retry(config)
+
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert len(delays) == 2
+        assert all(d <= 15.0 for d in delays)
+        # No sleep is wasted after the last allowed Claude call
+        assert mock_invoke.call_count == 3
+        assert mock_run_check.call_count == 1
 
-        results = run_checks_with_retry(config)
 
-        assert len(results) == 1
-        assert results[0].success is False
-        assert mock_invoke.call_count == 1
+def test_run_checks_with_retry_claude_json_parse_error(
+    single_check_config, mocked_checks
+):
+    """Test run_checks_with_retry when Claude JSON parsing fails during fix."""
+    mock_run_check, mock_invoke = mocked_checks
+
+    mock_run_check.return_value = CheckResult(
+        success=False, step_name="test", output="", error="Tests failed"
+    )
 
+    mock_invoke.side_effect = _CLAUDE_JSON_ERR
 
-def test_run_checks_with_retry_fix_prompt_content():
+    results = run_checks_with_retry(single_check_config)
+
+    assert len(results) == 1
+    assert results[0].success is False
+    assert mock_invoke.call_count == 1
+
+
+def test_run_checks_with_retry_fix_prompt_content(mocked_checks):
     """Test that fix prompt contains correct information from failed checks."""
     steps = [
         CheckStep(name="test", command="make test"),
@@ -297,95 +565,185 @@ def test_run_checks_with_retry_fix_prompt_content():
     ]
     config = ChecksConfig(steps=steps, max_retries=3)
 
-    with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
-    ):
-        # First attempt: both fail
-        # Second attempt: both pass
-        mock_run_check.side_effect = [
-            CheckResult(success=False, step_name="test", output="", error="Test error"),
-            CheckResult(success=False, step_name="lint", output="", error="Lint error"),
-            CheckResult(success=True, step_name="test", output="test passed"),
-            CheckResult(success=True, step_name="lint", output="lint passed"),
-        ]
+    mock_run_check, mock_invoke = mocked_checks
+
+    # First attempt: both fail
+    # Second attempt: both pass
+    mock_run_check.side_effect = _run_check_by_command(
+        {
+            "make test": [
+                CheckResult(
+                    success=False,
+                    step_name="test",
+                    output="",
+                    error="Test error",
+                    command="make test",
+                ),
+                CheckResult(success=True, step_name="test", output="test passed"),
+            ],
+            "make lint": [
+                CheckResult(
+                    success=False,
+                    step_name="lint",
+                    output="",
+                    error="Lint error",
+                    command="make lint",
+                ),
+                CheckResult(success=True, step_name="lint", output="lint passed"),
+            ],
+        }
+    )
 
-        run_checks_with_retry(config)
+    run_checks_with_retry(config)
+
+    # Verify fix prompt was called with correct content
+    assert mock_invoke.call_count == 1
+    fix_prompt = mock_invoke.call_args[0][0]
+    expected = (
+        "make test",
+        "make lint",
+        "Test error",
+        "Lint error",
+        "Please run these commands and fix all found issues",
+    )
+    missing = [text for text in expected if text not in fix_prompt]
+    assert not missing, f"missing from fix prompt: {missing}"
 
-        # Verify fix prompt was called with correct content
-        assert mock_invoke.call_count == 1
-        fix_prompt = mock_invoke.call_args[0][0]
-        assert "make test" in fix_prompt
-        assert "make lint" in fix_prompt
-        assert "Test error" in fix_prompt
-        assert "Lint error" in fix_prompt
-        assert "Please run these commands and fix all found issues" in fix_prompt
 
+def test_run_checks_with_retry_fix_prompt_format(mocked_checks):
+    """Test the exact layout of the fix prompt for multiple failures."""
+    steps = [
+        CheckStep(name="test", command="make test"),
+        CheckStep(name="lint", command="make lint"),
+    ]
+    config = ChecksConfig(steps=steps, max_retries=1)
+
+    mock_run_check, mock_invoke = mocked_checks
+
+    mock_run_check.side_effect = _run_check_by_command(
+        {
+            "make test": [
+                CheckResult(
+                    success=False,
+                    step_name="test",
+                    output="",
+                    error="Test error",
+                    command="make test",
+                ),
+                CheckResult(success=True, step_name="test", output=""),
+            ],
+            "make lint": [
+                CheckResult(
+                    success=False,
+                    step_name="lint",
+                    output="lint stdout",
+                    command="make lint",
+                ),
+                CheckResult(success=True, step_name="lint", output=""),
+            ],
+        }
+    )
 
-def test_run_checks_with_retry_uses_error_output_when_available():
-    """Test that fix prompt uses error output when available."""
-    steps = [CheckStep(name="test", command="make test")]
-    config = ChecksConfig(steps=steps, max_retries=3)
+    run_checks_with_retry(config)
+
+    assert mock_invoke.call_args[0][0] == (
+        "The following checks failed:\n"
+        "- `make test`\n"
+        "- `make lint`\n"
+        "\n"
+        "Error outputs:\n"
+        "test:\nTest error\n"
+        "lint:\nlint stdout\n"
+        "\n"
+        "Please run these commands and fix all found issues."
+    )
 
-    with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
-    ):
-        mock_run_check.side_effect = [
-            CheckResult(
-                success=False,
-                step_name="test",
-                output="stdout content",
-                error="stderr error content",
-            ),
-            CheckResult(success=True, step_name="test", output="test passed"),
-        ]
 
-        run_checks_with_retry(config)
+def test_run_checks_with_retry_fix_prompt_steps_with_same_name(mocked_checks):
+    """Test that fix prompt keeps each command when step names collide."""
+    steps = [
+        CheckStep(name="check", command="make test"),
+        CheckStep(name="check", command="make lint"),
+    ]
+    config = ChecksConfig(steps=steps, max_retries=1)
+
+    mock_run_check, mock_invoke = mocked_checks
+
+    mock_run_check.side_effect = _run_check_by_command(
+        {
+            "make test": [
+                CheckResult(
+                    success=True, step_name="check", output="", command="make test"
+                ),
+                CheckResult(
+                    success=True, step_name="check", output="", command="make test"
+                ),
+            ],
+            "make lint": [
+                CheckResult(
+                    success=False,
+                    step_name="check",
+                    output="",
+                    error="Lint error",
+                    command="make lint",
+                ),
+                CheckResult(
+                    success=True, step_name="check", output="", command="make lint"
+                ),
+            ],
+        }
+    )
 
-        fix_prompt = mock_invoke.call_args[0][0]
-        # Should use error (stderr) over output (stdout)
-        assert "stderr error content" in fix_prompt
-        assert "stdout content" not in fix_prompt
+    run_checks_with_retry(config)
 
+    fix_prompt = mock_invoke.call_args[0][0]
+    assert "`make lint`" in fix_prompt
+    assert "`make test`" not in fix_prompt
 
-def test_run_checks_with_retry_uses_output_when_no_error():
-    """Test that fix prompt uses output when error is not available."""
-    steps = [CheckStep(name="test", command="make test")]
-    config = ChecksConfig(steps=steps, max_retries=3)
 
-    with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
-    ):
-        mock_run_check.side_effect = [
+@pytest.mark.parametrize(
+    ("failed", "expected", "unexpected"),
+    [
+        # Should use error (stderr) over output (stdout)
+        pytest.param(
             CheckResult(
-                success=False, step_name="test", output="stdout content", error=None
+                success=False,
+                step_name="test",
+                output="stdout content",
+                error="stderr error content",
             ),
-            CheckResult(success=True, step_name="test", output="test passed"),
-        ]
-
-        run_checks_with_retry(config)
-
-        fix_prompt = mock_invoke.call_args[0][0]
-        assert "stdout content" in fix_prompt
-
-
-def test_run_checks_with_retry_handles_no_output():
-    """Test that fix prompt handles case when both output and error are empty."""
-    steps = [CheckStep(name="test", command="make test")]
-    config = ChecksConfig(steps=steps, max_retries=3)
-
-    with (
-        patch("vibe.checks.run_check") as mock_run_check,
-        patch("vibe.checks.invoke_claude") as mock_invoke,
-    ):
-        mock_run_check.side_effect = [
-            CheckResult(success=False, step_name="test", output="", error=None),
-            CheckResult(success=True, step_name="test", output="test passed"),
-        ]
+            "stderr error content",
+            "stdout content",
+            id="uses_error_output_when_available",
+        ),
+        pytest.param(
+            CheckResult(success=False, step_name="test", output="stdout content"),
+            "stdout content",
+            None,
+            id="uses_output_when_no_error",
+        ),
+        pytest.param(
+            CheckResult(success=False, step_name="test", output=""),
+            "No output",
+            None,
+            id="handles_no_output",
+        ),
+    ],
+)
+def test_run_checks_with_retry_fix_prompt_check_output(
+    single_check_config, mocked_checks, failed, expected, unexpected
+):
+    """Test which output of a failed check the fix prompt quotes."""
+    mock_run_check, mock_invoke = mocked_checks
+
+    mock_run_check.side_effect = [
+        failed,
+        CheckResult(success=True, step_name="test", output="test passed"),
+    ]
 
-        run_checks_with_retry(config)
+    run_checks_with_retry(single_check_config)
 
-        fix_prompt = mock_invoke.call_args[0][0]
-        assert "No output" in fix_prompt
+    fix_prompt = mock_invoke.call_args[0][0]
+    assert expected in fix_prompt
+    if unexpected is not None:
+        assert unexpected not in fix_prompt
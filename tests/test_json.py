@@ -0,0 +1,36 @@
+"""Unit tests for vibe._json module."""
+
+import json
+
+import pytest
+
+from vibe import _json
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """Run a test with orjson (if installed) and with the stdlib fallback."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(_json, "orjson", None)
+    elif _json.orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+@pytest.mark.usefixtures("backend")
+def test_loads_bytes_and_text():
+    """Test that loads accepts both bytes and text."""
+    assert _json.loads(b'{"result": "ok"}') == {"result": "ok"}
+    assert _json.loads('{"result": "你好"}') == {"result": "你好"}
+
+
+@pytest.mark.usefixtures("backend")
+def test_loads_invalid_raises_json_decode_error():
+    """Test that invalid input raises json.JSONDecodeError with either backend."""
+    with pytest.raises(json.JSONDecodeError):
+        _json.loads(b"not json")
+
+
+@pytest.mark.usefixtures("backend")
+def test_dumps_pretty():
+    """Test that dumps_pretty indents by two spaces."""
+    assert _json.dumps_pretty({"a": [1]}) == '{\n  "a": [\n    1\n  ]\n}'
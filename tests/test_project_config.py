@@ -1,11 +1,9 @@
 """Unit tests for vibe.project_config module."""
 
-import tempfile
-from pathlib import Path
+import re
 from unittest.mock import patch
 
 import pytest
-import yaml
 from pydantic import ValidationError
 
 from vibe.project_config import (
@@ -16,6 +14,27 @@ from vibe.project_config import (
 )
 
 
+# Message of the ValueError raised when a config file fails validation
+_FAILED_VALIDATE_RE = re.compile("Failed to validate")
+
+
+@pytest.fixture
+def vibe_config(tmp_path):
+    """Write .vibe/vibe.yaml under tmp_path.
+
+    Returns a function taking the YAML text and returning the path of the
+    written config file, to be passed to load_project_config.
+    """
+    config_file = tmp_path / ".vibe" / "vibe.yaml"
+
+    def write(text):
+        config_file.parent.mkdir(exist_ok=True)
+        config_file.write_text(text, encoding="utf-8")
+        return config_file
+
+    return write
+
+
 def test_check_step_model():
     """Test CheckStep model creation and validation."""
     step = CheckStep(name="test", command="make test")
@@ -34,6 +53,13 @@ def test_checks_config_defaults():
     config = ChecksConfig()
     assert config.steps == []
     assert config.max_retries == 10
+    assert config.max_concurrency is None
+
+
+def test_checks_config_invalid_max_concurrency():
+    """Test ChecksConfig rejects non-positive max_concurrency."""
+    with pytest.raises(ValidationError):
+        ChecksConfig(max_concurrency=0)
 
 
 def test_checks_config_with_values():
@@ -66,184 +92,146 @@ def test_project_config_with_checks():
     assert config.checks.max_retries == 3
 
 
-def test_load_project_config_missing_file():
+def test_load_project_config_missing_file(tmp_path, monkeypatch):
     """Test load_project_config when config file doesn't exist."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        # Don't create .vibe directory, so config file won't exist
+    # tmp_path starts empty, so there is no .vibe/vibe.yaml under it
+    monkeypatch.chdir(tmp_path)
 
-        with patch("pathlib.Path.cwd", return_value=tmp_path):
-            result = load_project_config()
-            assert result is None
+    assert load_project_config() is None
 
 
-def test_load_project_config_empty_file():
+def test_load_project_config_empty_file(vibe_config):
     """Test load_project_config with empty YAML file."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        vibe_dir = tmp_path / ".vibe"
-        vibe_dir.mkdir()
-        config_file = vibe_dir / "vibe.yaml"
-        config_file.write_text("", encoding="utf-8")
+    config_file = vibe_config("")
 
-        with patch("pathlib.Path.cwd", return_value=tmp_path):
-            result = load_project_config()
-            assert result is not None
-            assert isinstance(result, ProjectConfig)
-            assert result.checks is None
+    result = load_project_config(config_file)
+    assert result is not None
+    assert isinstance(result, ProjectConfig)
+    assert result.checks is None
 
 
-def test_load_project_config_valid_with_checks():
+def test_load_project_config_valid_with_checks(vibe_config):
     """Test load_project_config with valid config containing checks."""
-    config_data = {
-        "checks": {
-            "steps": [
-                {"name": "test", "command": "make test"},
-                {"name": "lint", "command": "make lint"},
-            ],
-            "max_retries": 5,
-        }
-    }
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        vibe_dir = tmp_path / ".vibe"
-        vibe_dir.mkdir()
-        config_file = vibe_dir / "vibe.yaml"
-        config_file.write_text(yaml.dump(config_data), encoding="utf-8")
-
-        with patch("pathlib.Path.cwd", return_value=tmp_path):
-            result = load_project_config()
-            assert result is not None
-            assert isinstance(result, ProjectConfig)
-            assert result.checks is not None
-            assert len(result.checks.steps) == 2
-            assert result.checks.max_retries == 5
-            assert result.checks.steps[0].name == "test"
-            assert result.checks.steps[1].name == "lint"
-
-
-def test_load_project_config_valid_without_checks():
-    """Test load_project_config with valid config without checks section."""
-    config_data = {}
+    config_file = vibe_config(
+        "checks:\n"
+        "  steps:\n"
+        "    - name: test\n"
+        "      command: make test\n"
+        "    - name: lint\n"
+        "      command: make lint\n"
+        "  max_retries: 5\n"
+    )
+
+    result = load_project_config(config_file)
+    assert result is not None
+    assert isinstance(result, ProjectConfig)
+    assert result.checks is not None
+    assert len(result.checks.steps) == 2
+    assert result.checks.max_retries == 5
+    assert result.checks.steps[0].name == "test"
+    assert result.checks.steps[1].name == "lint"
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        vibe_dir = tmp_path / ".vibe"
-        vibe_dir.mkdir()
-        config_file = vibe_dir / "vibe.yaml"
-        config_file.write_text(yaml.dump(config_data), encoding="utf-8")
 
-        with patch("pathlib.Path.cwd", return_value=tmp_path):
-            result = load_project_config()
-            assert result is not None
-            assert isinstance(result, ProjectConfig)
-            assert result.checks is None
+def test_load_project_config_valid_without_checks(vibe_config):
+    """Test load_project_config with valid config without checks section."""
+    config_file = vibe_config("{}\n")
+
+    result = load_project_config(config_file)
+    assert result is not None
+    assert isinstance(result, ProjectConfig)
+    assert result.checks is None
 
 
-def test_load_project_config_invalid_yaml():
+def test_load_project_config_invalid_yaml(vibe_config):
     """Test load_project_config with invalid YAML."""
+    # Imported here, like in vibe.project_config, so the model tests don't load it
+    import yaml  # noqa: PLC0415
+
     invalid_yaml = (
         "checks:\n  steps:\n    - name: test\n      command: make test\ninvalid: ["
     )
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        vibe_dir = tmp_path / ".vibe"
-        vibe_dir.mkdir()
-        config_file = vibe_dir / "vibe.yaml"
-        config_file.write_text(invalid_yaml, encoding="utf-8")
+    config_file = vibe_config(invalid_yaml)
 
-        with (
-            patch("pathlib.Path.cwd", return_value=tmp_path),
-            pytest.raises(yaml.YAMLError),
-        ):
-            load_project_config()
+    with pytest.raises(yaml.YAMLError):
+        load_project_config(config_file)
 
 
-def test_load_project_config_invalid_structure():
+def test_load_project_config_invalid_structure(vibe_config):
     """Test load_project_config with invalid config structure."""
-    config_data = {
-        "checks": {
-            "steps": [
-                {"name": "test"},  # Missing 'command' field
-            ],
-        }
-    }
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        vibe_dir = tmp_path / ".vibe"
-        vibe_dir.mkdir()
-        config_file = vibe_dir / "vibe.yaml"
-        config_file.write_text(yaml.dump(config_data), encoding="utf-8")
-
-        with (
-            patch("pathlib.Path.cwd", return_value=tmp_path),
-            pytest.raises(ValueError, match="Failed to validate"),
-        ):
-            load_project_config()
-
-
-def test_load_project_config_invalid_max_retries_type():
+    # Missing 'command' field
+    config_file = vibe_config("checks:\n  steps:\n    - name: test\n")
+
+    with pytest.raises(ValueError, match=_FAILED_VALIDATE_RE):
+        load_project_config(config_file)
+
+
+def test_load_project_config_invalid_max_retries_type(vibe_config):
     """Test load_project_config with invalid max_retries type."""
-    config_data = {
-        "checks": {
-            "steps": [{"name": "test", "command": "make test"}],
-            "max_retries": "not-a-number",  # Should be int
-        }
-    }
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        vibe_dir = tmp_path / ".vibe"
-        vibe_dir.mkdir()
-        config_file = vibe_dir / "vibe.yaml"
-        config_file.write_text(yaml.dump(config_data), encoding="utf-8")
-
-        with (
-            patch("pathlib.Path.cwd", return_value=tmp_path),
-            pytest.raises(ValueError, match="Failed to validate"),
-        ):
-            load_project_config()
-
-
-def test_load_project_config_checks_with_default_max_retries():
+    config_file = vibe_config(
+        "checks:\n"
+        "  steps:\n"
+        "    - name: test\n"
+        "      command: make test\n"
+        "  max_retries: not-a-number\n"  # Should be int
+    )
+
+    with pytest.raises(ValueError, match=_FAILED_VALIDATE_RE):
+        load_project_config(config_file)
+
+
+def test_load_project_config_checks_with_default_max_retries(vibe_config):
     """Test load_project_config with checks but no max_retries (uses default)."""
-    config_data = {
-        "checks": {
-            "steps": [{"name": "test", "command": "make test"}],
-        }
-    }
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        vibe_dir = tmp_path / ".vibe"
-        vibe_dir.mkdir()
-        config_file = vibe_dir / "vibe.yaml"
-        config_file.write_text(yaml.dump(config_data), encoding="utf-8")
-
-        with patch("pathlib.Path.cwd", return_value=tmp_path):
-            result = load_project_config()
-            assert result is not None
-            assert result.checks is not None
-            assert result.checks.max_retries == 10  # Default value
-
-
-def test_load_project_config_empty_checks_steps():
+    config_file = vibe_config(
+        "checks:\n  steps:\n    - name: test\n      command: make test\n"
+    )
+
+    result = load_project_config(config_file)
+    assert result is not None
+    assert result.checks is not None
+    assert result.checks.max_retries == 10  # Default value
+
+
+def test_load_project_config_empty_checks_steps(vibe_config):
     """Test load_project_config with empty checks steps."""
-    config_data = {"checks": {"steps": [], "max_retries": 3}}
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        vibe_dir = tmp_path / ".vibe"
-        vibe_dir.mkdir()
-        config_file = vibe_dir / "vibe.yaml"
-        config_file.write_text(yaml.dump(config_data), encoding="utf-8")
-
-        with patch("pathlib.Path.cwd", return_value=tmp_path):
-            result = load_project_config()
-            assert result is not None
-            assert result.checks is not None
-            assert len(result.checks.steps) == 0
-            assert result.checks.max_retries == 3
+    config_file = vibe_config("checks:\n  steps: []\n  max_retries: 3\n")
+
+    result = load_project_config(config_file)
+    assert result is not None
+    assert result.checks is not None
+    assert len(result.checks.steps) == 0
+    assert result.checks.max_retries == 3
+
+
+def test_load_project_config_cached_until_file_changes(vibe_config):
+    """Test that an unchanged config file is parsed only once."""
+    import yaml  # noqa: PLC0415
+
+    config_file = vibe_config(
+        "checks:\n  steps:\n    - name: test\n      command: make test\n"
+    )
+
+    with patch("yaml.load", wraps=yaml.load) as mock_load:
+        first = load_project_config(config_file)
+        second = load_project_config(config_file)
+        assert second is first
+        assert mock_load.call_count == 1
+
+        config_file.write_text(
+            "checks:\n  steps:\n    - name: lint\n      command: make lint\n"
+            "  max_retries: 2\n",
+            encoding="utf-8",
+        )
+        third = load_project_config(config_file)
+        assert mock_load.call_count == 2
+        assert third.checks.steps[0].name == "lint"
+
+
+def test_project_config_models_are_frozen():
+    """Test that config models can't be mutated, as loaded configs are shared."""
+    config = ProjectConfig(checks=ChecksConfig(steps=[]))
+
+    with pytest.raises(ValidationError):
+        config.checks = None
+    with pytest.raises(ValidationError):
+        config.checks.max_retries = 1
@@ -1,10 +1,9 @@
 """Unit tests for vibe.settings module."""
 
-from pathlib import Path
-
 import pytest
 from pydantic import ValidationError
 
+from tests._paths import project_root
 from vibe.settings import (
     PROJECT_ROOT as SETTINGS_PROJECT_ROOT,
 )
@@ -14,21 +13,23 @@ from vibe.settings import (
 )
 
 
-@pytest.fixture(autouse=True)
-def clear_settings_cache():
-    """Clear the get_settings LRU cache before and after each test."""
-    get_settings.cache_clear()
-    yield
-    get_settings.cache_clear()
+# In pydantic v2, model_config is a dict-like object set on the class
+_CONFIGURED_ENV_FILE = Settings.model_config.get("env_file")
 
 
-def test_defaults_when_no_env_vars(monkeypatch):
-    """Settings should use defaults when environment variables are not set."""
-    # Ensure related environment variables are unset
-    for key in ["APP_NAME", "DEBUG", "LOG_LEVEL", "ENVIRONMENT"]:
-        monkeypatch.delenv(key, raising=False)
+@pytest.fixture(scope="module")
+def default_settings():
+    """Build Settings once from field defaults alone (no env vars, no .env)."""
+    with pytest.MonkeyPatch.context() as mp:
+        for key in ["APP_NAME", "DEBUG", "LOG_LEVEL", "ENVIRONMENT"]:
+            mp.delenv(key, raising=False)
+        # Settings are frozen, so the instance can be shared by the module
+        return Settings(_env_file=None)
 
-    s = Settings()
+
+def test_defaults_when_no_env_vars(default_settings):
+    """Settings should use defaults when environment variables are not set."""
+    s = default_settings
     assert s.app_name == "vibe"
     assert s.debug is False
     assert s.log_level == "INFO"
@@ -40,12 +41,13 @@ def test_environment_overrides(monkeypatch):
     monkeypatch.setenv("DEBUG", "true")
     monkeypatch.setenv("LOG_LEVEL", "ERROR")
 
-    s = Settings()
+    s = Settings(_env_file=None)
     assert s.app_name == "custom-app"
     assert s.debug is True
     assert s.log_level == "ERROR"
 
 
+@pytest.mark.usefixtures("clear_settings_cache")
 def test_get_settings_is_cached():
     """get_settings should return the same instance until cache is cleared."""
     # Prime the cache and get the first instance
@@ -61,31 +63,42 @@ def test_get_settings_is_cached():
 
 def test_project_root_and_env_file_config():
     """PROJECT_ROOT should point to repo root; env_file should reference .env there."""
-    # From the tests/ directory, repo root is the parent
-    expected_repo_root = Path(__file__).resolve().parents[1]
-
-    assert SETTINGS_PROJECT_ROOT.resolve() == expected_repo_root
+    assert SETTINGS_PROJECT_ROOT.resolve() == project_root()
 
     # Validate env_file configured to PROJECT_ROOT/.env
-    # In pydantic v2, model_config is a dict-like object set on the class
-    env_file = Settings.model_config.get("env_file")
-    assert isinstance(env_file, tuple)
-    assert env_file[0] == SETTINGS_PROJECT_ROOT / ".env"
+    assert isinstance(_CONFIGURED_ENV_FILE, tuple)
+    assert _CONFIGURED_ENV_FILE[0] == SETTINGS_PROJECT_ROOT / ".env"
 
 
 def test_unknown_env_vars_are_ignored(monkeypatch):
     """Unknown environment vars should be ignored due to extra='ignore'."""
     monkeypatch.setenv("UNKNOWN_SETTING", "something")
-    s = Settings()
+    s = Settings(_env_file=None)
 
     # Accessing an unknown attribute should raise AttributeError (not set)
     with pytest.raises(AttributeError):
         _ = s.unknown_setting
 
 
+def test_log_level_is_case_insensitive(monkeypatch):
+    """LOG_LEVEL should accept level names in any case."""
+    monkeypatch.setenv("LOG_LEVEL", "debug")
+
+    assert Settings(_env_file=None).log_level == "DEBUG"
+
+
 def test_invalid_log_level_raises(monkeypatch):
     """Invalid LOG_LEVEL should trigger validation error due to Literal type."""
     monkeypatch.setenv("LOG_LEVEL", "VERBOSE")  # Not in allowed list
 
     with pytest.raises(ValidationError):
-        Settings()
+        Settings(_env_file=None)
+
+
+@pytest.mark.usefixtures("clear_settings_cache")
+def test_settings_are_frozen():
+    """The shared settings instance should not be mutable."""
+    s = get_settings()
+
+    with pytest.raises(ValidationError):
+        s.debug = True
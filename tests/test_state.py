@@ -0,0 +1,76 @@
+"""Unit tests for vibe.state module."""
+
+import json
+
+import pytest
+
+from vibe.state import StateStore
+
+
+def test_state_store_missing_file(tmp_path):
+    """Test that a missing state file loads as empty state."""
+    store = StateStore(tmp_path / ".vibe" / "state.json")
+
+    assert not store.is_done("dir", "prompt1.txt")
+
+
+def test_state_store_invalid_file(tmp_path):
+    """Test that unreadable or malformed state files start fresh."""
+    state_file = tmp_path / "state.json"
+    state_file.write_text("{not json")
+    assert not StateStore(state_file).is_done("dir", "prompt1.txt")
+
+    state_file.write_text(json.dumps({"dir": "prompt1.txt", "other": ["a.txt"]}))
+    store = StateStore(state_file)
+    assert not store.is_done("dir", "prompt1.txt")
+    assert store.is_done("other", "a.txt")
+
+
+def test_state_store_mark_done_journals_until_compacted(tmp_path):
+    """Test that completions go to the journal and compact into state.json."""
+    state_file = tmp_path / ".vibe" / "state.json"
+    store = StateStore(state_file)
+
+    store.mark_done("dir", "b.txt")
+    store.mark_done("dir", "a.txt")
+
+    assert not state_file.exists()
+    assert StateStore(state_file).is_done("dir", "a.txt")
+
+    store.compact()
+
+    assert not store.journal_path.exists()
+    assert json.loads(state_file.read_text()) == {"dir": ["a.txt", "b.txt"]}
+
+
+def test_state_store_compacting_on_error(tmp_path):
+    """Test that compacting() still folds in the journal when the block raises."""
+    state_file = tmp_path / "state.json"
+    store = StateStore(state_file)
+
+    def mark_then_fail():
+        with store.compacting():
+            store.mark_done("dir", "a.txt")
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        mark_then_fail()
+
+    assert json.loads(state_file.read_text()) == {"dir": ["a.txt"]}
+
+
+def test_state_store_save_failure_keeps_previous_file(tmp_path, mocker):
+    """Test that a failed state write leaves the previous state.json intact."""
+    state_file = tmp_path / "state.json"
+    state_file.write_text('{"dir":["prompt1.txt"]}')
+    store = StateStore(state_file)
+    store.mark_done("dir", "prompt2.txt")
+
+    mocker.patch("vibe.state.json.dump", side_effect=OSError("disk full"))
+
+    assert store.save() is False
+    store.compact()
+    assert state_file.read_text() == '{"dir":["prompt1.txt"]}'
+    assert not state_file.with_suffix(".json.tmp").exists()
+    # The journal is kept, so the completion isn't lost
+    assert store.journal_path.exists()